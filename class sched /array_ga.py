@@ -0,0 +1,179 @@
+import time
+import argparse
+import numpy as np
+from fitness_cache import FitnessCache
+from generic_algorithm import (load_data, POPULATION_SIZE, number_of_elite_schedules, mutation_rate,
+                               tournament_selection_size)
+
+# Array-backed GA engine.  A population is one (population, classes, gene) int32 array; the genes
+# of a class are indexes into the dataset's meeting times, rooms and instructors.  Selection,
+# crossover and mutation are masks over the whole array and fitness is evaluated for every
+# schedule at once, with the same conflicts as schedule.get_fitness: classes sharing a
+# (meeting time, room) or a (meeting time, instructor) pairwise, plus over-capacity rooms.
+MEETING_TIME, ROOM, INSTRUCTOR = 0, 1, 2
+GENES = 3
+
+# Up to this many (schedule, key) counters are counted with one bincount; above it the keys are
+# counted with np.unique so memory stays proportional to the population
+BINCOUNT_LIMIT = 1 << 24
+
+
+class GeneTables:
+    # Classes in schedule.initialize order (department by department) with their course sizes,
+    # and the capacities of the candidate rooms
+    def __init__(self, data):
+        self.meetingTimes = list(data.get_meetingTimes())
+        self.rooms = list(data.get_rooms())
+        self.instructors = list(data.get_instructors())
+        self.classes = [(dept, course) for dept in data.get_depts() for course in dept.get_courses()]
+        self.maxStudents = np.array([course.get_maxStudents() for _, course in self.classes], dtype=np.int32)
+        self.capacity = np.array([room.get_seatingCapacity() for room in self.rooms], dtype=np.int32)
+        self.sizes = np.array([len(self.meetingTimes), len(self.rooms), len(self.instructors)], dtype=np.int64)
+        # upper gene bounds per class; every class draws from the same tables
+        self.bounds = np.broadcast_to(self.sizes, (len(self.classes), GENES))
+        for array in (self.maxStudents, self.capacity, self.sizes):
+            array.flags.writeable = False  # shared by every population (and forked worker)
+
+    def num_classes(self):
+        return len(self.classes)
+
+    # `classes` names the class of every gene vector when they are not all classes in order
+    def random_genes(self, shape, rng, classes=None):
+        bounds = self.bounds if classes is None else self.bounds[classes]
+        # scaled uniforms: much faster than rng.integers with a per-gene upper bound
+        return (rng.random(tuple(shape) + (GENES,)) * bounds).astype(np.int32)
+
+    def count_conflicts(self, population):
+        return count_conflicts(self, population)
+
+    def describe(self, genes):
+        # (dept, course, meetingTime, room, instructor) objects for one chromosome
+        return [(dept, course, self.meetingTimes[g[MEETING_TIME]], self.rooms[g[ROOM]], self.instructors[g[INSTRUCTOR]])
+                for (dept, course), g in zip(self.classes, genes)]
+
+
+# Sum over every schedule of n*(n-1)/2 for each key value shared by n classes
+def _pair_counts(keys, span):
+    size = len(keys)
+    flat = (keys + np.arange(size, dtype=np.int64)[:, None] * span).ravel()
+    if size * span <= BINCOUNT_LIMIT:
+        counts = np.bincount(flat, minlength=size * span).reshape(size, span)
+        return (counts * (counts - 1) // 2).sum(axis=1)
+    values, counts = np.unique(flat, return_counts=True)
+    return np.bincount(values // span, weights=counts * (counts - 1) // 2, minlength=size).astype(np.int64)
+
+
+def count_conflicts(tables, population):
+    meetingTime = population[..., MEETING_TIME].astype(np.int64)
+    room = population[..., ROOM].astype(np.int64)
+    instructor = population[..., INSTRUCTOR].astype(np.int64)
+    n_rooms, n_instructors = int(tables.sizes[ROOM]), int(tables.sizes[INSTRUCTOR])
+    conflicts = _pair_counts(meetingTime * n_rooms + room, int(tables.sizes[MEETING_TIME]) * n_rooms)
+    conflicts += _pair_counts(meetingTime * n_instructors + instructor,
+                              int(tables.sizes[MEETING_TIME]) * n_instructors)
+    conflicts += (tables.capacity[population[..., ROOM]] < tables.maxStudents[None, :]).sum(axis=1)
+    return conflicts
+
+
+def fitness(conflicts):
+    return 1.0 / (conflicts + 1.0)
+
+
+# Works on any gene tables with num_classes(), random_genes(shape, rng, classes) and
+# count_conflicts(population), e.g. hybrid.SlotGeneTables for the CP-SAT schedule
+class ArrayGeneticAlgorithm:
+    def __init__(self, tables, population_size=POPULATION_SIZE, elites=number_of_elite_schedules,
+                 mutation_rate=mutation_rate, tournament_size=tournament_selection_size, seed=None, cache=None):
+        self.tables = tables
+        self.population_size = population_size
+        self.elites = elites
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.rng = np.random.default_rng(seed)
+        self.cache = cache  # optional FitnessCache
+        self.evaluations = 0  # schedules evaluated, from the cache or scored
+        self.scored = 0       # schedules whose conflicts were actually counted
+
+    def initial_population(self):
+        return self.tables.random_genes((self.population_size, self.tables.num_classes()), self.rng)
+
+    def evaluate(self, population):
+        self.evaluations += len(population)
+        if self.cache is None:
+            self.scored += len(population)
+            return self.tables.count_conflicts(population)
+        conflicts, scored = self.cache.evaluate(population, self.tables.count_conflicts)
+        self.scored += scored
+        return conflicts
+
+    # Index of the fittest of `tournament_size` random schedules, for n tournaments at once
+    def select(self, conflicts, n):
+        entrants = self.rng.integers(0, len(conflicts), size=(n, self.tournament_size))
+        return entrants[np.arange(n), np.argmin(conflicts[entrants], axis=1)]
+
+    # Uniform crossover: each class comes from either parent with probability 1/2
+    def crossover(self, parents1, parents2):
+        mask = self.rng.random(parents1.shape[:2]) > 0.5
+        return np.where(mask[..., None], parents1, parents2)
+
+    # A mutated class gets new random genes, as in genetic_algorithm._mutate_schedule
+    def mutate(self, population):
+        schedules, classes = np.nonzero(self.rng.random(population.shape[:2]) < self.mutation_rate)
+        population[schedules, classes] = self.tables.random_genes((len(schedules),), self.rng, classes)
+        return population
+
+    # One generation; returns the next population and its conflict counts
+    def evolve(self, population, conflicts):
+        elites = population[np.argsort(conflicts, kind="stable")[:self.elites]]
+        n = self.population_size - len(elites)
+        children = self.crossover(population[self.select(conflicts, n)], population[self.select(conflicts, n)])
+        population = np.concatenate([elites, self.mutate(children)])
+        conflicts = self.evaluate(population)
+        if self.cache is not None:
+            self.cache.end_generation()
+        return population, conflicts
+
+    def run(self, generations, population=None):
+        population = self.initial_population() if population is None else population
+        conflicts = self.evaluate(population)
+        if self.cache is not None:
+            self.cache.end_generation()
+        for generation in range(generations):
+            if conflicts.min() == 0:
+                break
+            population, conflicts = self.evolve(population, conflicts)
+        return population, conflicts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Array-backed genetic algorithm over the GA dataset")
+    parser.add_argument("--population-size", type=int, default=1000)
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--mutation-rate", type=float, default=mutation_rate)
+    parser.add_argument("--tournament-size", type=int, default=tournament_selection_size)
+    parser.add_argument("--elites", type=int, default=number_of_elite_schedules)
+    parser.add_argument("--cache-size", type=int, default=0, help="memoize fitness of this many chromosomes (LRU)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    tables = GeneTables(load_data())
+    cache = FitnessCache(args.cache_size) if args.cache_size else None
+    algorithm = ArrayGeneticAlgorithm(tables, args.population_size, args.elites, args.mutation_rate,
+                                      args.tournament_size, args.seed, cache)
+    started = time.perf_counter()
+    population, conflicts = algorithm.run(args.generations)
+    seconds = time.perf_counter() - started
+    best = int(np.argmin(conflicts))
+    print(f"best schedule: {int(conflicts[best])} conflicts; {algorithm.evaluations} schedules evaluated "
+          f"in {seconds:.2f}s ({algorithm.evaluations / seconds:.0f}/s)")
+    if cache is not None:
+        print(cache.describe())
+        for generation, (hits, misses) in enumerate(cache.history):
+            print(f"  generation {generation}: {hits} hits, {misses} misses")
+    for dept, course, meetingTime, room, instructor in tables.describe(population[best]):
+        print(f"{dept.get_name()} {course.get_courseNumber()} {room.get_number()} ({room.get_seatingCapacity()}) "
+              f"{instructor.get_id()} {meetingTime.get_id()} ({meetingTime.get_time()})")
+
+
+if __name__ == "__main__":
+    main()
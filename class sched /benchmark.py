@@ -0,0 +1,83 @@
+import os
+import time
+import argparse
+import tempfile
+import subprocess
+import pandas as pd
+from ortools.sat.python import cp_model
+from data_loader import load_inputs
+from instance_generator import generate_instance, write_instance
+from scheduler import FORMULATIONS
+from solver_config import add_solver_arguments, config_from_args, solve
+
+RESULT_COLUMNS = ["timestamp", "revision", "scale", "seed", "formulation", "courses", "sections", "slots",
+                  "build_seconds", "variables", "constraints", "solve_seconds", "status", "objective"]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run_case(data_dir, formulation, config):
+    inputs = load_inputs(data_dir, use_cache=False)
+    started = time.perf_counter()
+    schedule = FORMULATIONS[formulation](inputs).build()
+    build_seconds = time.perf_counter() - started
+
+    proto = schedule.model.Proto()
+    solver, status = solve(schedule.model, config)
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "formulation": formulation,
+        "courses": len(inputs["fall_courses"]),
+        "sections": len(inputs["intro_courses"]),
+        "slots": len(inputs["timeslot"]),
+        "build_seconds": round(build_seconds, 4),
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "solve_seconds": round(solver.WallTime(), 4),
+        "status": solver.StatusName(status),
+        "objective": solver.ObjectiveValue() if solved else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmark on synthetic instances")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--formulations", nargs="+", choices=sorted(FORMULATIONS), default=sorted(FORMULATIONS))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--slot-step", type=int, help="use a generated slot grid instead of the sample slots")
+    parser.add_argument("--instances-dir", help="keep the generated instances here (default: temporary)")
+    parser.add_argument("--output", default="benchmark_results.csv", help="results are appended to this CSV")
+    add_solver_arguments(parser)
+    args = parser.parse_args(argv)
+    config = config_from_args(args)
+
+    revision = git_revision()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.instances_dir or tmp
+        results = []
+        for scale in args.scales:
+            for seed in args.seeds:
+                data_dir = write_instance(generate_instance(scale=scale, slot_step=args.slot_step, seed=seed),
+                                          os.path.join(root, f"scale{scale:g}_seed{seed}"))
+                for formulation in args.formulations:
+                    row = run_case(data_dir, formulation, config)
+                    row.update(timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"), revision=revision, scale=scale, seed=seed)
+                    results.append(row)
+                    print(f"scale {scale:g} seed {seed} {formulation:8s} {row['variables']:7d} vars "
+                          f"{row['constraints']:7d} cons  build {row['build_seconds']:.3f}s  "
+                          f"solve {row['solve_seconds']:.3f}s  {row['status']}")
+
+    results = pd.DataFrame(results, columns=RESULT_COLUMNS)
+    write_header = not os.path.exists(args.output)
+    results.to_csv(args.output, mode="a", header=write_header, index=False)
+    print(f"{len(results)} results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
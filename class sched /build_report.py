@@ -0,0 +1,122 @@
+import re
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Per constraint-family build statistics.  Each family records wall time, the constraints and
+# variables it added to the model and (while tracemalloc is tracing) its peak Python memory.
+# Solver statistics, including the presolved model size parsed from the solve log, are added
+# after the solve.  A report loaded with a cached model keeps the statistics of the original
+# build; it is marked as cached and dated with that build.
+
+
+class BuildReport:
+    def __init__(self):
+        self.families = []
+        self.solver = {}
+        self.meta = {}
+        self.built_at = time.time()
+        self.cached = False
+
+    @contextmanager
+    def family(self, name, model):
+        proto = model.Proto()
+        constraints, variables = len(proto.constraints), len(proto.variables)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = {
+                "family": name,
+                "seconds": time.perf_counter() - started,
+                "constraints": len(proto.constraints) - constraints,
+                "variables": len(proto.variables) - variables,
+                "peak_memory_bytes": tracemalloc.get_traced_memory()[1] - base if tracing else None,
+            }
+            self.families.append(entry)
+
+    def record_solver(self, solver, status):
+        response = solver.ResponseProto()
+        self.solver = {
+            "status": solver.StatusName(status),
+            "objective": response.objective_value,
+            "best_bound": response.best_objective_bound,
+            "wall_time": response.wall_time,
+            "user_time": response.user_time,
+            "deterministic_time": response.deterministic_time,
+            "num_booleans": response.num_booleans,
+            "num_conflicts": response.num_conflicts,
+            "num_branches": response.num_branches,
+            "num_binary_propagations": response.num_binary_propagations,
+            "num_integer_propagations": response.num_integer_propagations,
+            "num_restarts": response.num_restarts,
+            "num_lp_iterations": response.num_lp_iterations,
+        }
+        log = response.solve_log
+        if log:
+            self.solver["model"] = _model_sizes(log, "Initial ")
+            self.solver["presolved_model"] = _model_sizes(log, "Presolved ")
+
+    def totals(self):
+        return {
+            "seconds": sum(f["seconds"] for f in self.families),
+            "constraints": sum(f["constraints"] for f in self.families),
+            "variables": sum(f["variables"] for f in self.families),
+        }
+
+    def build(self):
+        return {"cached": self.cached, "built_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.built_at))}
+
+    def to_dict(self):
+        return {"meta": self.meta, "build": self.build(), "families": self.families, "totals": self.totals(),
+                "solver": self.solver}
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def table(self):
+        lines = [f"build statistics of the cached model, built {time.ctime(self.built_at)}"] if self.cached else []
+        lines.append(f"{'family':24s} {'seconds':>9s} {'constraints':>11s} {'variables':>9s} {'peak KiB':>9s}")
+        for f in self.families + [dict(self.totals(), family="total", peak_memory_bytes=None)]:
+            peak = "" if f["peak_memory_bytes"] is None else f"{f['peak_memory_bytes'] / 1024:.1f}"
+            lines.append(f"{f['family']:24s} {f['seconds']:9.4f} {f['constraints']:11d} {f['variables']:9d} {peak:>9s}")
+        if self.solver:
+            lines.append("")
+            lines.append(f"solver: {self.solver['status']}, objective {self.solver['objective']:g}, "
+                         f"{self.solver['wall_time']:.3f}s wall, {self.solver['num_conflicts']} conflicts, "
+                         f"{self.solver['num_branches']} branches")
+            for label in ("model", "presolved_model"):
+                sizes = self.solver.get(label)
+                if sizes:
+                    counts = ", ".join(f"{k} {v}" for k, v in sizes.items())
+                    lines.append(f"{label.replace('_', ' ')}: {counts}")
+        return "\n".join(lines)
+
+
+# Solver parameters that copy the search log into the response (without printing it)
+def logging_parameters(print_log=False):
+    return {"log_search_progress": True, "log_to_response": True, "log_to_stdout": bool(print_log)}
+
+
+# "#Variables: 1'022 ..." and "#kAtMostOne: 620 ..." lines of the model summary starting at `header`
+def _model_sizes(log, header):
+    lines = log.splitlines()
+    start = next((i for i, line in enumerate(lines) if line.startswith(header) and "model" in line), None)
+    if start is None:
+        return {}
+    sizes = {}
+    for line in lines[start + 1:]:
+        if not line.startswith(("#", " ")):
+            break
+        match = re.match(r"#(\w+): ([\d']+)", line)
+        if not match:
+            continue
+        name = "variables" if match.group(1) == "Variables" else match.group(1)
+        sizes[name] = int(match.group(2).replace("'", ""))
+    return sizes
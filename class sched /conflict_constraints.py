@@ -0,0 +1,36 @@
+# Conflict constraints as one AddAtMostOne per maximal group of mutually overlapping slots.
+# In an interval graph every maximal clique is the set of intervals alive just before
+# some interval ends, so one sweep over the sorted start/end events finds all of them.
+
+
+def overlap_cliques(indices, starts, ends, buffer=0):
+    # indices: registry entries; starts/ends: their start/end minutes.
+    # Intervals are treated as [start, end + buffer), matching SlotTimes.overlap(buffer).
+    events = []
+    for idx, start, end in zip(indices, starts, ends):
+        events.append((int(end) + buffer, 0, idx))
+        events.append((int(start), 1, idx))
+    events.sort(key=lambda e: (e[0], e[1]))  # ends before starts at the same minute
+
+    cliques = []
+    active = {}
+    grew = False
+    for _, is_start, idx in events:
+        if is_start:
+            active[idx] = None
+            grew = True
+        else:
+            if grew and len(active) > 1:
+                cliques.append(list(active))
+            grew = False
+            del active[idx]
+    return cliques
+
+
+def add_conflict_cliques(model, registry, slot_times, indices, buffer=0):
+    # Replaces the pairwise `x1 + x2 <= 1` clauses for one resource-day
+    slots = [registry.slot_index(i) for i in indices]
+    cliques = overlap_cliques(indices, slot_times.start[slots], slot_times.end[slots], buffer)
+    for clique in cliques:
+        model.AddAtMostOne(registry.vars(clique))
+    return len(cliques)
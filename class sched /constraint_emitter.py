@@ -0,0 +1,46 @@
+# Constraint emission with native Boolean primitives.
+#   exactly_one      AddExactlyOne instead of sum(...) == 1
+#   forbid           unit clause instead of a linear `var == 0`
+#   penalty_if_both  one clause (not a or not b or p): p is forced to 1 when a and b are both
+#                    chosen and is otherwise left to the objective, which keeps it at 0, so penalty
+#                    literals are only meaningful while their family is in the objective
+# With anonymous=True variables get empty names and their labels are kept in a side table keyed
+# by proto index, which keeps name formatting out of the build and names out of the proto.
+
+
+class Emitter:
+    def __init__(self, model, anonymous=False):
+        self.model = model
+        self.anonymous = anonymous
+        self.labels = {}  # proto index -> (prefix, *parts), only for anonymous variables
+
+    # The model is not pickled with the emitter (model_cache stores it separately)
+    def __getstate__(self):
+        return {"anonymous": self.anonymous, "labels": self.labels}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, model=None)
+
+    def name(self, label):
+        return "" if self.anonymous else str(label)
+
+    def bool_var(self, prefix, *parts):
+        if not self.anonymous:
+            return self.model.NewBoolVar("_".join([prefix] + [str(part) for part in parts]))
+        var = self.model.NewBoolVar("")
+        self.labels[var.Index()] = (prefix,) + parts
+        return var
+
+    def label(self, var):
+        return self.labels.get(var.Index(), var.Name())
+
+    def exactly_one(self, literals):
+        self.model.AddExactlyOne(literals)
+
+    def forbid(self, literal):
+        self.model.AddBoolOr([literal.Not()])
+
+    def penalty_if_both(self, a, b, prefix, *parts):
+        penalty = self.bool_var(prefix, *parts)
+        self.model.AddBoolOr([a.Not(), b.Not(), penalty])
+        return penalty
@@ -0,0 +1,193 @@
+import os
+import ast
+import pickle
+import hashlib
+import pandas as pd
+from time_model import to_minutes
+from variable_registry import Interner
+
+# Every script reads its inputs through load_inputs.  Paths default to the repository's Data/
+# directory and can be moved with CLASS_SCHEDULER_DATA (or data_dir= / --data-dir).
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("CLASS_SCHEDULER_DATA", os.path.join(HERE, "..", "Data"))
+CACHE_DIR = os.environ.get("CLASS_SCHEDULER_CACHE", os.path.join(HERE, "..", ".model_cache"))
+
+INPUT_FILES = {
+    "fall_courses": "fallcourses.csv",
+    "intro_courses": "intro.csv",
+    "timeslot": "timeslot.csv",
+    "specialization": "programs_dimension.csv",
+    "external_courses": "external.csv",
+    "faculty_preferences": "instructor_preferences.csv",
+}
+# Read when present: rooms.csv turns on room assignment (see room_assignment)
+OPTIONAL_FILES = {
+    "rooms": "rooms.csv",
+}
+
+REQUIRED_COLUMNS = {
+    "fall_courses": ["course_code", "credit_hours", "Days", "instructor_name", "meeting_time"],
+    "intro_courses": ["course_code", "credit_hours", "Days", "TA_ID", "meeting_time"],
+    "timeslot": ["TimeSlotID", "start_time", "end_time", "meeting_time", "Credit_hours"],
+    "specialization": ["Required_courses", "Elective_courses", "External_courses"],
+    "external_courses": ["external_courses", "Day", "Start_Time", "End_Time"],
+    "faculty_preferences": ["instructor_name", "preferred_time", "breaks_between_session"],
+    "rooms": ["RoomNumber", "SeatingCapacity"],
+}
+
+days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+DAY_BITS = {day: 1 << i for i, day in enumerate(days_of_week)}
+# Spellings found in the department's sheets
+DAY_ALIASES = {"Tusday": "Tuesday", "Tues": "Tuesday", "Tue": "Tuesday", "Wed": "Wednesday", "Thurs": "Thursday",
+               "Thu": "Thursday", "Mon": "Monday", "Fri": "Friday"}
+
+CACHE_VERSION = 2
+
+
+def safe_eval(val):
+    if isinstance(val, str):
+        try:
+            val = ast.literal_eval(val)
+        except (SyntaxError, ValueError):
+            val = val.strip("[]").split(",")
+    if isinstance(val, str):
+        val = [val]
+    if not isinstance(val, (list, tuple)):
+        return []
+    return [v.strip().strip('"').strip() for v in val if v.strip().strip('"').strip()]
+
+
+def parse_days(days):
+    if isinstance(days, (list, tuple)):
+        return list(days)
+    if pd.isna(days):
+        return []
+    parsed = [d.strip().capitalize() for d in str(days).split(",") if d.strip()]
+    return [DAY_ALIASES.get(d, d) for d in parsed if DAY_ALIASES.get(d, d) in DAY_BITS]
+
+
+def day_mask(days):
+    mask = 0
+    for day in days:
+        mask |= DAY_BITS[day]
+    return mask
+
+
+def _validate(name, path, df):
+    missing = [c for c in REQUIRED_COLUMNS[name] if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+
+
+def _courses(df, person_column, courses, persons):
+    df["course_code"] = df["course_code"].astype(str).str.strip()
+    df[person_column] = df[person_column].astype(str).str.strip()
+    df["credit_hours"] = df["credit_hours"].astype(int)
+    df["meeting_time"] = df["meeting_time"].astype(int)
+    day_lists = df["Days"].apply(parse_days)
+    df["Days"] = day_lists.apply(",".join)
+    df["day_mask"] = day_lists.apply(day_mask).astype("int8")
+    df["course_id"] = df["course_code"].apply(courses.intern).astype("int32")
+    df["person_id"] = df[person_column].apply(persons.intern).astype("int32")
+    if "MaxStudents" in df.columns:  # optional enrollment; unknown counts as 0 (any room fits)
+        df["MaxStudents"] = pd.to_numeric(df["MaxStudents"], errors="coerce").fillna(0).astype("int32")
+    return df
+
+
+def _normalize(tables):
+    courses, persons = Interner(), Interner()
+    fall_courses = _courses(tables["fall_courses"], "instructor_name", courses, persons)
+    intro_courses = _courses(tables["intro_courses"], "TA_ID", courses, persons)
+
+    timeslot = tables["timeslot"]
+    timeslot["TimeSlotID"] = timeslot["TimeSlotID"].astype(str).str.strip()
+    timeslot["start_min"] = timeslot["start_time"].apply(to_minutes).astype("int32")
+    timeslot["end_min"] = timeslot["end_time"].apply(to_minutes).astype("int32")
+
+    specialization = tables["specialization"]
+    specialization["required_courses"] = specialization["Required_courses"].apply(safe_eval)
+    specialization["elective_courses"] = specialization["Elective_courses"].apply(safe_eval)
+    specialization["external_courses"] = specialization["External_courses"].apply(safe_eval)
+
+    external_courses = tables["external_courses"]
+    external_courses["external_courses"] = external_courses["external_courses"].astype(str).str.strip()
+    external_courses["Day"] = external_courses["Day"].apply(parse_days)
+    external_courses["day_mask"] = external_courses["Day"].apply(day_mask).astype("int8")
+    external_courses["start_min"] = external_courses["Start_Time"].apply(to_minutes).astype("int32")
+    external_courses["end_min"] = external_courses["End_Time"].apply(to_minutes).astype("int32")
+
+    prefs = tables["faculty_preferences"]
+    prefs["instructor_name"] = prefs["instructor_name"].astype(str).str.strip()
+    prefs["preferred_time"] = prefs["preferred_time"].fillna("").astype(str).str.strip().str.lower()
+    prefs["breaks_between_session"] = pd.to_numeric(prefs["breaks_between_session"], errors="coerce")
+    if "preferred_days" in prefs.columns:
+        prefs["preferred_days"] = prefs["preferred_days"].apply(parse_days)
+    if "Course_taught" in prefs.columns:
+        prefs["Course_taught"] = prefs["Course_taught"].apply(safe_eval)
+
+    if "rooms" in tables:
+        rooms = tables["rooms"].dropna(subset=["RoomNumber", "SeatingCapacity"]).reset_index(drop=True)
+        rooms["RoomNumber"] = rooms["RoomNumber"].astype(str).str.strip()
+        rooms["SeatingCapacity"] = rooms["SeatingCapacity"].astype("int32")
+        if len(rooms):
+            tables["rooms"] = rooms
+        else:  # an empty rooms.csv is the same as none
+            del tables["rooms"]
+
+    inputs = dict(tables)
+    inputs["course_ids"] = courses
+    inputs["person_ids"] = persons
+    return inputs
+
+
+def _read(data_dir, files):
+    tables = {}
+    for name, filename in files.items():
+        path = os.path.join(data_dir, filename)
+        if name in OPTIONAL_FILES and not os.path.exists(path):
+            continue
+        df = pd.read_csv(path)
+        df.columns = df.columns.str.strip()
+        _validate(name, path, df)
+        tables[name] = df
+    return tables
+
+
+def _stamp(data_dir, files):
+    stamp = []
+    for name, filename in sorted(files.items()):
+        path = os.path.join(data_dir, filename)
+        if name in OPTIONAL_FILES and not os.path.exists(path):
+            stamp.append((name, filename, None, None))
+            continue
+        st = os.stat(path)
+        stamp.append((name, filename, st.st_mtime_ns, st.st_size))
+    return (CACHE_VERSION, stamp)
+
+
+# Parse, validate and normalize every input table once.  The parsed tables are pickled next to
+# the model cache and reused while no input file's mtime/size changes.
+def load_inputs(data_dir=DATA_DIR, files=None, use_cache=True, cache_dir=CACHE_DIR):
+    files = dict(INPUT_FILES, **OPTIONAL_FILES, **(files or {}))
+    data_dir = os.path.abspath(data_dir)
+    stamp = _stamp(data_dir, files)
+    cache_path = os.path.join(cache_dir, "inputs-" + hashlib.sha256(repr((data_dir, sorted(files.items()))).encode())
+                              .hexdigest()[:16] + ".pkl")
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached_stamp, inputs = pickle.load(f)
+            if cached_stamp == stamp:
+                os.utime(cache_path)  # model_cache evicts the least recently used files first
+                return inputs
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+    inputs = _normalize(_read(data_dir, files))
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cache_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((stamp, inputs), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    return inputs
@@ -1,10 +1,13 @@
 import pandas as pd
 from ortools.sat.python import cp_model
+from solver_config import solve
+from data_loader import load_inputs, parse_days
 
 
-fall_courses = pd.read_csv("/Users/justiineazigi/Downloads/Data/fallcourses.csv")
-intro_courses = pd.read_csv("/Users/justiineazigi/Downloads/Data/intro.csv")
-timeslot = pd.read_csv("/Users/justiineazigi/Downloads/Data/timeslot.csv")
+inputs = load_inputs()
+fall_courses = inputs["fall_courses"]
+intro_courses = inputs["intro_courses"]
+timeslot = inputs["timeslot"]
 fall_courses.head()
 intro_courses.head()
 timeslot.head()
@@ -30,7 +33,7 @@ for row in ta_courses.itertuples(index=False):
         ts_credit_hours = ts_row.Credit_hours
 
         if ts_credit_hours == credit_hours and ts_meeting_time == meeting_time:
-            for day in [day.strip().capitalize() for day in row.Days.split(",")]:
+            for day in parse_days(row.Days):
                 key = (course, section, ts_id, ts_start_time, ts_end_time, day, assigned_ta)
                 schedule_vars[key] = model.NewBoolVar(f"{course}_Sec{section}_{ts_id}_{ts_start_time}_{ts_end_time}_{day}_{assigned_ta}")
 
@@ -50,7 +53,7 @@ for row in fall_courses.itertuples(index=False):
         ts_credit_hours = ts_row.Credit_hours
 
         if ts_credit_hours == credit_hours and ts_meeting_time == meeting_time:
-            for day in [day.strip().capitalize() for day in row.Days.split(",")]:
+            for day in parse_days(row.Days):
                 key = (course, ts_id, ts_start_time, ts_end_time, day, assigned_instructor)
                 schedule_vars[key] = model.NewBoolVar(f"{course}_{ts_id}_{ts_start_time}_{ts_end_time}_{day}_{assigned_instructor}")
 
@@ -72,7 +75,7 @@ for ta in intro_courses["TA_ID"].unique():
 
 for row in fall_courses.itertuples(index=False):
     course = row.course_code
-    days = [day.strip().capitalize() for day in row.Days.split(",")]
+    days = parse_days(row.Days)
     course_schedule = [schedule_vars[key] for key in schedule_vars if key[0] == course and key[5] in days]
     if course_schedule:
         model.Add(sum(course_schedule) == len(days))  # Must be assigned to all days it meets
@@ -81,7 +84,7 @@ for row in fall_courses.itertuples(index=False):
 for row in intro_courses.itertuples(index=False):
     course = row.course_code
     section = row.section
-    days = [day.strip().capitalize() for day in row.Days.split(",")]
+    days = parse_days(row.Days)
     course_schedule = [schedule_vars[key] for key in schedule_vars if key[0] == course and key[1] == section and key[5] in days]
     if course_schedule:
         model.Add(sum(course_schedule) == len(days))  # Must be assigned to all listed days
@@ -100,8 +103,7 @@ for course in intro_courses["course_code"].unique():
 
 
 
-solver = cp_model.CpSolver()
-status = solver.Solve(model)
+solver, status = solve(model)
 
 if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
     print("\nFinal Course Schedule:")
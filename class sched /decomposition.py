@@ -0,0 +1,103 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from ortools.sat.python import cp_model
+from final import BooleanScheduleModel
+from solver_config import SolverConfig, solve
+
+# Worst status first; the merged run reports the worst component status
+STATUS_ORDER = [cp_model.MODEL_INVALID, cp_model.INFEASIBLE, cp_model.UNKNOWN, cp_model.FEASIBLE, cp_model.OPTIMAL]
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, items):
+        items = list(items)
+        for item in items:
+            self.find(item)
+        for item in items[1:]:
+            a, b = self.find(items[0]), self.find(item)
+            if a != b:
+                self.parent[b] = a
+
+
+# Courses interact only through a shared instructor/TA (conflicts, preferences, breaks) or a
+# shared program requirement list (required conflicts, elective overlap).  External-course
+# conflicts involve a single department course each, so they never link two courses.  Rooms
+# (rooms.csv) are shared by every course, so with rooms there is a single component.  The
+# graph comes straight from the loaded course tables; no model is built before splitting.
+def interaction_components(inputs):
+    intro_courses = inputs["intro_courses"]
+    ta_courses = intro_courses[intro_courses["TA_ID"].str.startswith("TA")]  # as course_rows
+    graph = UnionFind()
+    by_person = {}
+    for df, person_column in ((ta_courses, "TA_ID"), (inputs["fall_courses"], "instructor_name")):
+        for course, person in zip(df["course_code"], df[person_column]):
+            graph.find(course)
+            by_person.setdefault(person, []).append(course)
+    for courses in by_person.values():
+        graph.union(courses)
+    if "rooms" in inputs:
+        graph.union(list(graph.parent))
+
+    known = set(graph.parent)
+    for _, row in inputs["specialization"].iterrows():
+        graph.union([c for c in set(row["required_courses"]) | set(row["elective_courses"]) if c in known])
+
+    components = {}
+    for course in known:
+        components.setdefault(graph.find(course), set()).add(course)
+    return sorted(components.values(), key=len, reverse=True)
+
+
+# Inputs restricted to one component; shared tables (slots, externals, preferences) are kept whole
+def component_inputs(inputs, courses):
+    sub = dict(inputs)
+    for name in ("fall_courses", "intro_courses"):
+        df = inputs[name]
+        sub[name] = df[df["course_code"].isin(courses)].reset_index(drop=True)
+    specialization = inputs["specialization"]
+    touches = specialization.apply(
+        lambda row: bool(courses & (set(row["required_courses"]) | set(row["elective_courses"]))), axis=1)
+    sub["specialization"] = specialization[touches]
+    return sub
+
+
+def solve_component(inputs, model_class=BooleanScheduleModel, config=None, weights=None, options=None):
+    schedule = model_class(inputs, **(options or {})).build()
+    if weights:
+        schedule.set_objective(weights)
+    solver, status = solve(schedule.model, config)
+    rows = schedule.rows(solver) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else []
+    return status, rows
+
+
+# Solve every connected component on its own and merge the rows.  Components run in a process
+# pool; the configured search workers are split between the processes.
+def solve_decomposed(inputs, model_class=BooleanScheduleModel, config=None, jobs=None, weights=None, options=None):
+    config = config or SolverConfig()
+    components = interaction_components(inputs)
+    jobs = max(1, min(jobs or config.num_search_workers, len(components)))
+    component_config = copy.deepcopy(config)
+    component_config.num_search_workers = max(1, config.num_search_workers // jobs)
+
+    tasks = [component_inputs(inputs, courses) for courses in components]
+    if jobs == 1:
+        results = [solve_component(sub, model_class, component_config, weights, options) for sub in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(solve_component, tasks, [model_class] * len(tasks),
+                                    [component_config] * len(tasks), [weights] * len(tasks),
+                                    [options] * len(tasks)))
+
+    status = min((s for s, _ in results), key=STATUS_ORDER.index, default=cp_model.OPTIMAL)
+    rows = [row for _, component_rows in results for row in component_rows]
+    return status, rows, components
@@ -0,0 +1,120 @@
+from collections import Counter, defaultdict
+import numpy as np
+from data_loader import parse_days
+from time_model import TIME_BLOCKS, load_external_times
+
+# Pre-creation filter for the hard rules that only depend on a single course: faculty
+# time-of-day windows (Constraint 7), faculty preferred days and, with hard_externals=True,
+# clashes between a program's required courses and its external courses (Constraint 6).
+# Each course's candidate slots are checked against these rules before any variable exists,
+# so the model only holds feasible (course, slot) literals.  The constraint families still
+# enforce the same rules on whatever literals do exist (e.g. IncrementalScheduler, which
+# builds unpruned so preferences can be relaxed later).
+
+EXTERNAL_BUFFER = 10  # minutes of transition time, as in add_external_penalties
+
+
+class ExternalIndex:
+    # external.csv as one sorted interval list per day.  An overlap query is a binary search on
+    # the start times plus a vectorized check of the end times, so a campus-wide timetable with
+    # thousands of rows is queried per (slot, day) rather than scanned per course.
+    def __init__(self, external_courses):
+        per_day = defaultdict(list)
+        for (name, day), (start, end) in load_external_times(external_courses).items():
+            per_day[day].append((start, end, name))
+        self._days = {}
+        for day, intervals in per_day.items():
+            intervals.sort()
+            self._days[day] = (np.array([i[0] for i in intervals], dtype=np.int32),
+                               np.array([i[1] for i in intervals], dtype=np.int32),
+                               np.array([i[2] for i in intervals], dtype=object))
+
+    def __len__(self):
+        return sum(len(starts) for starts, _, _ in self._days.values())
+
+    # External courses meeting on `day` that overlap [start, end] with `buffer` minutes between them
+    def overlapping(self, day, start, end, buffer=0):
+        if day not in self._days:
+            return set()
+        starts, ends, names = self._days[day]
+        k = np.searchsorted(starts, end + buffer, side="left")
+        return set(names[:k][ends[:k] + buffer > start])
+
+
+class CourseDomains:
+    def __init__(self, inputs, slot_times, hard_externals=True):
+        self.slot_times = slot_times
+        self.hard_externals = hard_externals
+        self.index = ExternalIndex(inputs["external_courses"]) if hard_externals else None
+        self._overlaps = {}
+        self.pruned = {}      # course -> {reason: number of pruned candidate slots}
+        self.candidates = 0
+        self.kept = 0
+        self.empty = []       # courses left without any candidate slot
+
+        self.preferences = {}
+        for _, row in inputs["faculty_preferences"].iterrows():
+            pref = str(row["preferred_time"]).strip().lower()
+            days = parse_days(row["preferred_days"]) if "preferred_days" in row.index else []
+            self.preferences[row["instructor_name"]] = (TIME_BLOCKS.get(pref), set(days))
+
+        self.externals = defaultdict(set)  # required course -> external courses it must not clash with
+        if hard_externals:
+            for _, row in inputs["specialization"].iterrows():
+                for req in row["required_courses"]:
+                    self.externals[req].update(row["external_courses"])
+
+    # External courses overlapping slot s on `day`, cached across courses
+    def _external_clashes(self, s, day):
+        key = (s, day)
+        names = self._overlaps.get(key)
+        if names is None:
+            names = self.index.overlapping(day, int(self.slot_times.start[s]), int(self.slot_times.end[s]),
+                                           EXTERNAL_BUFFER)
+            self._overlaps[key] = names
+        return names
+
+    # Boolean mask over `slots` (slot indexes) of the candidates that satisfy every hard rule
+    def feasible(self, course, person, days, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        keep = np.ones(len(slots), dtype=bool)
+        reasons = Counter()
+
+        def drop(mask, reason):
+            removed = int((keep & ~mask).sum())
+            if removed:
+                reasons[reason] += removed
+                keep[:] &= mask
+
+        window, preferred_days = self.preferences.get(person, (None, set()))
+        if window is not None:
+            drop(self.slot_times.overlaps_window(*window)[slots], "time_preference")
+        if preferred_days and not set(days) <= preferred_days:
+            drop(np.zeros(len(slots), dtype=bool), "preferred_days")
+        externals = self.externals.get(course)
+        if externals:
+            drop(np.array([not any(self._external_clashes(s, day) & externals for day in days) for s in slots],
+                          dtype=bool), "external")
+
+        self.candidates += len(slots)
+        self.kept += int(keep.sum())
+        if reasons:
+            self.pruned[course] = dict(reasons)
+        if len(slots) and not keep.any():
+            self.empty.append(course)
+        return keep
+
+    def summary(self):
+        reasons = Counter()
+        for counts in self.pruned.values():
+            reasons.update(counts)
+        return {"candidates": self.candidates, "kept": self.kept, "pruned": self.candidates - self.kept,
+                "by_reason": dict(reasons), "courses_pruned": len(self.pruned), "empty_domains": list(self.empty)}
+
+    def describe(self):
+        summary = self.summary()
+        reasons = ", ".join(f"{reason} {count}" for reason, count in summary["by_reason"].items()) or "nothing pruned"
+        text = f"Domain pruning: kept {summary['kept']} of {summary['candidates']} candidate slots ({reasons})"
+        if summary["empty_domains"]:
+            text += f"; no feasible slot for {', '.join(summary['empty_domains'])}"
+        return text
@@ -1,206 +1,273 @@
 import pandas as pd
 from ortools.sat.python import cp_model
-import ast
-from itertools import combinations, product
-from datetime import datetime, timedelta
-from collections import defaultdict
-
-# Load datasets
-fall_courses = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/fallcourses.csv")
-intro_courses = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/intro.csv")
-timeslot = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/timeslot.csv")
-
-model = cp_model.CpModel()
-days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-schedule_vars = {}
-
-# Decision Variables: Intro & Fall Courses
-ta_courses = intro_courses[intro_courses["TA_ID"].str.startswith("TA")]
-for row in ta_courses.itertuples(index=False):
-    for ts_row in timeslot.itertuples(index=False):
-        if ts_row.Credit_hours == row.credit_hours and ts_row.meeting_time == row.meeting_time:
-            for day in [d.strip().capitalize() for d in row.Days.split(",")]:
-                key = (row.course_code, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, row.TA_ID)
-                schedule_vars[key] = model.NewBoolVar(f"{key}")
-
-for row in fall_courses.itertuples(index=False):
-    for ts_row in timeslot.itertuples(index=False):
-        if ts_row.Credit_hours == row.credit_hours and ts_row.meeting_time == row.meeting_time:
-            for day in [d.strip().capitalize() for d in row.Days.split(",")]:
-                key = (row.course_code, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, row.instructor_name)
-                schedule_vars[key] = model.NewBoolVar(f"{key}")
-
-print(f"Total decision variables created: {len(schedule_vars)}")
-
-
-# Constraint 1: Each course meets once per scheduled day
-for df in [fall_courses, intro_courses]:
-    for row in df.itertuples(index=False):
-        for day in [d.strip().capitalize() for d in row.Days.split(",")]:
-            model.Add(sum(schedule_vars[key] for key in schedule_vars if key[0] == row.course_code and key[4] == day) == 1)
-
-# Helper function
-def times_overlap(start1, end1, start2, end2):
-    fmt = "%H:%M"
-    s1 = datetime.strptime(start1, fmt)
-    e1 = datetime.strptime(end1, fmt)
-    s2 = datetime.strptime(start2, fmt)
-    e2 = datetime.strptime(end2, fmt)
-    return s1 < e2 and s2 < e1
-
-# Constraint 2: Instructor/TA conflict avoidance
-for instructor in fall_courses['instructor_name'].unique():
-    for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]:
-        relevant_vars = [key for key in schedule_vars if key[4] == day and key[5] == instructor]
-        for i in range(len(relevant_vars)):
-            for j in range(i + 1, len(relevant_vars)):
-                k1 = relevant_vars[i]
-                k2 = relevant_vars[j]
-                if times_overlap(k1[2], k1[3], k2[2], k2[3]):
-                    model.Add(schedule_vars[k1] + schedule_vars[k2] <= 1)
-
-# TA conflict constraint (handling  time overlaps!)
-for ta in intro_courses['TA_ID'].unique():
-    for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]:
-        relevant_vars = [key for key in schedule_vars if key[4] == day and key[5] == ta]
-        for i in range(len(relevant_vars)):
-            for j in range(i + 1, len(relevant_vars)):
-                k1 = relevant_vars[i]
-                k2 = relevant_vars[j]
-                if times_overlap(k1[2], k1[3], k2[2], k2[3]):
-                    model.Add(schedule_vars[k1] + schedule_vars[k2] <= 1)
-
-
-# Constraint 3: Same time slot across course days
-course_day_vars = defaultdict(list)
-for key, var in schedule_vars.items():
-    course, _, start_time, end_time, day, _ = key
-    course_day_vars[(course, day)].append((key, var))
-
-for course in set(k[0] for k in course_day_vars):
-    days = [k[1] for k in course_day_vars if k[0] == course]
-    for d1, d2 in combinations(days, 2):
-        vars_day1 = [v for _, v in course_day_vars[(course, d1)]]
-        vars_day2 = [v for _, v in course_day_vars[(course, d2)]]
-        for v1, v2 in product(vars_day1, vars_day2):
-            model.Add(v1 == v2)
-
-# Constraint 4: No overlaps in specialization required courses
-specialization = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/programs_dimension.csv")
-specialization.columns = specialization.columns.str.strip()
-
-def safe_eval(val):
-    if isinstance(val, str):
-        try:
-            return ast.literal_eval(val)
-        except:
-            return [v.strip() for v in val.strip("[]").split(",")]
-    return val if isinstance(val, list) else []
-
-specialization["required_courses"] = specialization["Required_courses"].apply(safe_eval)
-specialization = specialization[specialization["required_courses"].apply(lambda x: len(x) > 1)]
-
-for _, row in specialization.iterrows():
-    for c1, c2 in combinations(set(row["required_courses"]), 2):
-        for day in days_of_week:
-            for k1 in [k for k in schedule_vars if k[0] == c1 and k[4] == day]:
-                for k2 in [k for k in schedule_vars if k[0] == c2 and k[4] == day]:
-                    if times_overlap(k1[2], k1[3], k2[2], k2[3]):
-                        model.Add(schedule_vars[k1] + schedule_vars[k2] <= 1)
-
-# Constraint 5: Required vs Elective conflict (soft)
-specialization["elective_courses"] = specialization["Elective_courses"].apply(safe_eval)
-specialization = specialization[specialization["elective_courses"].apply(lambda x: len(x) > 1)]
-overlap_penalties = []
-
-for _, row in specialization.iterrows():
-    for req, elec in product(set(row["required_courses"]), set(row["elective_courses"])):
-        for day in days_of_week:
-            for k1 in [k for k in schedule_vars if k[0] == req and k[4] == day]:
-                for k2 in [k for k in schedule_vars if k[0] == elec and k[4] == day]:
-                    if times_overlap(k1[2], k1[3], k2[2], k2[3]):
-                        penalty_var = model.NewBoolVar(f"penalty_{k1}_{k2}")
-                        model.Add(schedule_vars[k1] + schedule_vars[k2] <= 1 + penalty_var)
-                        overlap_penalties.append(penalty_var)
-
-# Constraint 6: External course conflict
-external_courses = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/external.csv")
-external_courses.columns = external_courses.columns.str.strip()
-external_courses["Day"] = external_courses["Day"].fillna("").apply(lambda x: [d.strip().capitalize() for d in x.split(",") if d.strip()])
-external_courses["Start_Time"] = external_courses["Start_Time"].astype(str)
-external_courses["End_Time"] = external_courses["End_Time"].astype(str)
-
-external_dict = {}
-for row in external_courses.itertuples(index=False):
-    for day in row.Day:
-        external_dict[(row.external_courses, day)] = (row.Start_Time, row.End_Time)
-
-specialization["External_courses"] = specialization["External_courses"].apply(safe_eval)
-
-for _, row in specialization.iterrows():
-    for ext in row["External_courses"]:
-        for req in row["Required_courses"]:
+from itertools import product
+from data_loader import DATA_DIR, INPUT_FILES, days_of_week, safe_eval, parse_days, load_inputs
+from variable_registry import VariableRegistry
+from time_model import SlotTimes, TIME_BLOCKS, load_external_times
+from conflict_constraints import add_conflict_cliques
+from solver_config import solve
+from build_report import BuildReport
+from soft_constraints import weighted_penalties
+from constraint_emitter import Emitter
+from domain_pruning import CourseDomains
+from room_assignment import RoomTable, capacity_classes, add_room_capacity
+
+SCHEDULE_COLUMNS = ["Course", "Instructor/TA", "Day", "Start Time", "End Time", "Slot"]
+
+
+class BooleanScheduleModel:
+    # One meeting-pattern Boolean per (course, slot); the per-day (course, slot, day, instructor/TA)
+    # assignments are registry entries sharing that literal.  anonymous=True leaves variables unnamed
+    # (the registry and the emitter's side table keep their keys).  prune=True only creates
+    # literals for slots that pass the hard single-course rules (see domain_pruning);
+    # hard_externals=False penalizes external course clashes instead of forbidding them.  With
+    # rooms in the inputs the room capacity classes are enforced (see room_assignment).
+    def __init__(self, inputs, anonymous=False, prune=True, hard_externals=True):
+        self.inputs = inputs
+        self.model = cp_model.CpModel()
+        self.emit = Emitter(self.model, anonymous)
+        self.slot_times = SlotTimes(inputs["timeslot"])
+        self.hard_externals = hard_externals
+        self.domains = CourseDomains(inputs, self.slot_times, hard_externals) if prune else None
+        self.registry = VariableRegistry(self.model, slot_ids=self.slot_times.ids)
+        self.penalties = {}
+        self.conjunctions = []  # (penalty, a, b): penalty literal that is 1 when a and b are both chosen
+        self.rooms = RoomTable(inputs["rooms"]) if "rooms" in inputs else None
+        self.report = BuildReport()
+
+    def build(self):
+        # Constraint 3 (same slot across days) has no family of its own, see add_decision_variables
+        with self.report.family("decision_variables", self.model):
+            self.add_decision_variables()
+        with self.report.family("once_per_day", self.model):
+            self.add_once_per_day()
+        with self.report.family("person_conflicts", self.model):
+            self.add_person_conflicts()
+        with self.report.family("required_conflicts", self.model):
+            self.add_required_conflicts()
+        if self.rooms is not None:
+            with self.report.family("room_capacity", self.model):
+                self.add_room_capacity()
+        with self.report.family("elective_overlap", self.model):
+            self.penalties["elective_overlap"] = self.add_elective_penalties()
+        with self.report.family("external", self.model):
+            self.penalties["external"] = self.add_external_penalties()
+        with self.report.family("time_preferences", self.model):
+            self.add_time_preferences()
+        with self.report.family("breaks", self.model):
+            self.penalties["breaks"] = self.add_break_penalties()
+
+        with self.report.family("objective", self.model):
+            self.set_objective()
+        if self.domains is not None:
+            self.report.meta["domains"] = self.domains.summary()
+        return self
+
+    # Objective function: weighted soft-constraint penalties (see soft_constraints.DEFAULT_WEIGHTS).
+    # The once-per-day equalities make the number of chosen literals constant, so it is not a target.
+    def set_objective(self, weights=None):
+        self.model.Minimize(weighted_penalties(self.penalties, weights))
+
+    # The constraint families below take an optional scope (courses, persons or program index
+    # labels) so IncrementalScheduler can rebuild only the part of the model a change touches.
+    def persons(self):
+        persons = list(self.inputs["fall_courses"]["instructor_name"].unique())
+        return persons + list(self.inputs["intro_courses"]["TA_ID"].unique())
+
+    def programs(self, programs=None):
+        specialization = self.inputs["specialization"]
+        if programs is not None:
+            specialization = specialization.loc[list(programs)]
+        return specialization.iterrows()
+
+    def course_rows(self):
+        # (course, person, row) for every TA-led intro section and faculty course
+        intro_courses = self.inputs["intro_courses"]
+        ta_courses = intro_courses[intro_courses["TA_ID"].str.startswith("TA")]
+        for row in ta_courses.itertuples(index=False):
+            yield row.course_code, row.TA_ID, row
+        for row in self.inputs["fall_courses"].itertuples(index=False):
+            yield row.course_code, row.instructor_name, row
+
+    def candidate_slots(self, row):
+        timeslot = self.inputs["timeslot"]
+        candidates = timeslot[(timeslot["Credit_hours"] == row.credit_hours) & (timeslot["meeting_time"] == row.meeting_time)]
+        if self.domains is None:
+            return candidates
+        person = row.instructor_name if hasattr(row, "instructor_name") else row.TA_ID
+        slots = [self.slot_times.index[str(slot_id)] for slot_id in candidates["TimeSlotID"]]
+        return candidates[self.domains.feasible(row.course_code, person, parse_days(row.Days), slots)]
+
+    # Decision Variables: Intro & Fall Courses
+    # Constraint 3 (same time slot across course days) holds by construction: every meeting day
+    # of a course shares the (course, slot) literal, so no cross-day equalities are needed.
+    def add_decision_variables(self, courses=None):
+        for course, person, row in self.course_rows():
+            if courses is not None and course not in courses:
+                continue
+            for ts_row in self.candidate_slots(row).itertuples(index=False):
+                pattern = None
+                for day in parse_days(row.Days):
+                    idx = self.registry.add(course, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, person,
+                                            name=self.emit.name((course, ts_row.TimeSlotID)), var=pattern)
+                    pattern = self.registry.var(idx)
+
+    # Constraint 1: Each course meets once per scheduled day, i.e. picks exactly one meeting pattern
+    def add_once_per_day(self, courses=None):
+        registry = self.registry
+        for df in [self.inputs["fall_courses"], self.inputs["intro_courses"]]:
+            for row in df.itertuples(index=False):
+                if courses is not None and row.course_code not in courses:
+                    continue
+                self.emit.exactly_one(registry.course_literals(row.course_code))
+
+    # Constraint 2: Instructor/TA conflict avoidance
+    def add_person_conflicts(self, persons=None):
+        for person in persons if persons is not None else self.persons():
             for day in days_of_week:
-                if (ext, day) in external_dict:
-                    ext_start, ext_end = external_dict[(ext, day)]
-                    for key in schedule_vars:
-                        if key[0] == req and key[4] == day and times_overlap(key[2], key[3], ext_start, ext_end, buffer_minutes=10):
-                            model.Add(schedule_vars[key] == 0)
-
-# Constraint 7: Faculty time preference (hard)
-faculty_preferences = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/instructor_preferences.csv")
-
-time_blocks = {
-    "morning": ("08:00", "11:59"),
-    "afternoon": ("12:00", "15:59"),
-    "evening": ("16:00", "19:50")
-}
-
-for _, row in faculty_preferences.iterrows():
-    pref = str(row["preferred_time"]).strip().lower()
-    if pref in time_blocks:
-        start_pref, end_pref = time_blocks[pref]
-        for key in schedule_vars:
-            if key[5] == row["instructor_name"]:
-                if not times_overlap(key[2], key[3], start_pref, end_pref):
-                    model.Add(schedule_vars[key] == 0)
-
-# Constraint 8: Breaks between sessions (soft)
-penalties = []
-for _, row in faculty_preferences.iterrows():
-    instructor = row["instructor_name"]
-    min_break = row["breaks_between_session"]
-    if pd.isna(min_break) or min_break < 0:
-        continue
-    for day in days_of_week:
-        rel_keys = [k for k in schedule_vars if k[5] == instructor and k[4] == day]
-        for i in range(len(rel_keys)):
-            for j in range(i + 1, len(rel_keys)):
-                k1, k2 = rel_keys[i], rel_keys[j]
-                s1, e1 = datetime.strptime(k1[2], "%H:%M"), datetime.strptime(k1[3], "%H:%M")
-                s2, e2 = datetime.strptime(k2[2], "%H:%M"), datetime.strptime(k2[3], "%H:%M")
-                gap = abs((s2 - e1).total_seconds() / 60)
-                if 0 <= gap < min_break:
-                    v = model.NewBoolVar(f"break_violation_{k1}_{k2}")
-                    model.Add(schedule_vars[k1] + schedule_vars[k2] == 2).OnlyEnforceIf(v)
-                    model.Add(schedule_vars[k1] + schedule_vars[k2] < 2).OnlyEnforceIf(v.Not())
-                    penalties.append(v)
-
-
-
-# Objective function
-model.Maximize(sum(schedule_vars[k] for k in schedule_vars))
-
-# Solve
-solver = cp_model.CpSolver()
-status = solver.Solve(model)
-
-
-if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-    print("\n📅 Final Scheduled Assignments:\n")
-    for key, var in schedule_vars.items():
-        if solver.Value(var) == 1:
-            course, timeslot_id, start_time, end_time, day, instructor_or_ta = key
-            print(f"{course} assigned to {instructor_or_ta} on {day} from {start_time} to {end_time} (Slot {timeslot_id})")
-else:
-    print("❌ No feasible solution found.")
\ No newline at end of file
+                add_conflict_cliques(self.model, self.registry, self.slot_times, self.registry.by_person_day(person, day))
+
+    # Constraint 4: No overlaps in specialization required courses
+    def add_required_conflicts(self, programs=None):
+        registry = self.registry
+        for _, row in self.programs(programs):
+            required = row["required_courses"]
+            if len(required) < 2:
+                continue
+            for day in days_of_week:
+                per_course = [registry.by_course_day(c, day) for c in set(required)]
+                per_course = [idx for idx in per_course if idx]
+                if len(per_course) > 1:
+                    add_conflict_cliques(self.model, registry, self.slot_times, [i for idx in per_course for i in idx])
+
+    # Constraint 4b: No more courses at once than rooms that seat them (stage 1 of room_assignment)
+    def add_room_capacity(self, days=None):
+        classes = capacity_classes(self.rooms, self.inputs, self.registry.courses.names())
+        add_room_capacity(self.model, self.registry, self.slot_times, self.rooms, classes, days)
+
+    # Constraint 5: Required vs Elective conflict (soft)
+    def add_elective_penalties(self, programs=None):
+        registry = self.registry
+        overlap = self.slot_times.overlap()
+        overlap_penalties = []
+        for _, row in self.programs(programs):
+            for req, elec in product(set(row["required_courses"]), set(row["elective_courses"])):
+                pair_penalties = {}  # meeting days share pattern literals: one penalty per pair, counted per day
+                for day in days_of_week:
+                    for i1 in registry.by_course_day(req, day):
+                        for i2 in registry.by_course_day(elec, day):
+                            if overlap[registry.slot_index(i1), registry.slot_index(i2)]:
+                                pair = (registry.literal_of(i1), registry.literal_of(i2))
+                                if pair not in pair_penalties:
+                                    pair_penalties[pair] = self.emit.penalty_if_both(
+                                        registry.var(i1), registry.var(i2), "penalty", registry.key(i1), registry.key(i2))
+                                    self.conjunctions.append((pair_penalties[pair], registry.var(i1), registry.var(i2)))
+                                overlap_penalties.append(pair_penalties[pair])
+        return overlap_penalties
+
+    # Constraint 6: External course conflict -- the clashing literals are forbidden (after
+    # pruning there are none left) and the family has no penalties.  Without hard_externals a
+    # chosen clashing slot is its own penalty literal instead.
+    def add_external_penalties(self, programs=None):
+        registry = self.registry
+        external_dict = load_external_times(self.inputs["external_courses"])
+        clashes = []
+        for _, row in self.programs(programs):
+            for ext in row["external_courses"]:
+                for req in row["required_courses"]:
+                    for day in days_of_week:
+                        if (ext, day) in external_dict:
+                            ext_start, ext_end = external_dict[(ext, day)]
+                            clash = self.slot_times.overlaps_window(ext_start, ext_end, buffer=10)
+                            for idx in registry.by_course_day(req, day):
+                                if clash[registry.slot_index(idx)]:
+                                    clashes.append(registry.var(idx))
+        if self.hard_externals:
+            for lit in {var.Index(): var for var in clashes}.values():
+                self.emit.forbid(lit)
+            return []
+        return clashes
+
+    # Constraint 7: Faculty time preference and preferred days (hard)
+    def add_time_preferences(self, persons=None):
+        registry = self.registry
+        for _, row in self.inputs["faculty_preferences"].iterrows():
+            if persons is not None and row["instructor_name"] not in persons:
+                continue
+            pref = str(row["preferred_time"]).strip().lower()
+            in_window = self.slot_times.overlaps_window(*TIME_BLOCKS[pref]) if pref in TIME_BLOCKS else None
+            preferred_days = set(parse_days(row["preferred_days"])) if "preferred_days" in row.index else set()
+            # entries of a course share one literal per slot, forbid each literal once
+            forbidden = {}
+            for idx in registry.by_person(row["instructor_name"]):
+                if ((in_window is not None and not in_window[registry.slot_index(idx)]) or
+                        (preferred_days and registry.day_of(idx) not in preferred_days)):
+                    forbidden.setdefault(registry.literal_of(idx), registry.var(idx))
+            for lit in forbidden.values():
+                self.emit.forbid(lit)
+
+    # Constraint 8: Breaks between sessions (soft)
+    def add_break_penalties(self, persons=None):
+        registry = self.registry
+        gap = self.slot_times.gap()
+        penalties = []
+        for _, row in self.inputs["faculty_preferences"].iterrows():
+            instructor = row["instructor_name"]
+            if persons is not None and instructor not in persons:
+                continue
+            min_break = row["breaks_between_session"]
+            if pd.isna(min_break) or min_break < 0:
+                continue
+            pair_penalties = {}  # one penalty per literal pair, counted on every day it applies
+            for day in days_of_week:
+                rel_idx = registry.by_person_day(instructor, day)
+                for i in range(len(rel_idx)):
+                    for j in range(i + 1, len(rel_idx)):
+                        i1, i2 = rel_idx[i], rel_idx[j]
+                        if gap[registry.slot_index(i1), registry.slot_index(i2)] < min_break:
+                            pair = (registry.literal_of(i1), registry.literal_of(i2))
+                            if pair not in pair_penalties:
+                                pair_penalties[pair] = self.emit.penalty_if_both(
+                                    registry.var(i1), registry.var(i2), "break_violation", registry.key(i1), registry.key(i2))
+                                self.conjunctions.append((pair_penalties[pair], registry.var(i1), registry.var(i2)))
+                            penalties.append(pair_penalties[pair])
+        return penalties
+
+    # Hint values for the penalty literals implied by the hinted decision literals
+    def auxiliary_hints(self, value_of):
+        return [(penalty, value_of(a) * value_of(b)) for penalty, a, b in self.conjunctions]
+
+    def rows(self, solver):
+        return schedule_rows(solver, self.registry)
+
+
+# Chosen assignments as final_schedule.csv rows
+def schedule_rows(solver, registry):
+    return solution_rows(registry, solver.ResponseProto().solution)
+
+
+def solution_rows(registry, solution):
+    rows = []
+    for idx in registry.chosen(solution):
+        course, timeslot_id, start_time, end_time, day, instructor_or_ta = registry.key(idx)
+        rows.append({"Course": course, "Instructor/TA": instructor_or_ta, "Day": day,
+                     "Start Time": start_time, "End Time": end_time, "Slot": timeslot_id})
+    return rows
+
+
+if __name__ == "__main__":
+    schedule = BooleanScheduleModel(load_inputs()).build()
+    print(schedule.domains.describe())
+    print(f"Total decision variables created: {schedule.registry.num_literals()} "
+          f"({len(schedule.registry)} course-day assignments)")
+
+    # Solve (all cores; scheduler.py exposes the other solver settings)
+    solver, status = solve(schedule.model)
+
+    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        print("\n📅 Final Scheduled Assignments:\n")
+        for row in schedule.rows(solver):
+            print(f"{row['Course']} assigned to {row['Instructor/TA']} on {row['Day']} from {row['Start Time']} "
+                  f"to {row['End Time']} (Slot {row['Slot']})")
+    else:
+        print("❌ No feasible solution found.")
@@ -0,0 +1,85 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+# Fitness memoization for the array GA.  Chromosomes are keyed by a 12-byte BLAKE2 digest of
+# their gene vector; the cache holds at most `maxsize` entries and evicts the least recently
+# used.  Elites, migrants and children identical to a parent are looked up instead of scored,
+# and duplicates inside one population are scored once.  Hits and misses are also kept per
+# generation (end_generation closes one).
+
+
+class FitnessCache:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.history = []  # (hits, misses) of every closed generation
+        self._generation_hits = 0
+        self._generation_misses = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    @staticmethod
+    def key(genes):
+        return hashlib.blake2b(np.ascontiguousarray(genes).tobytes(), digest_size=12).digest()
+
+    def _hit(self):
+        self.hits += 1
+        self._generation_hits += 1
+
+    def _miss(self):
+        self.misses += 1
+        self._generation_misses += 1
+
+    def get(self, key):
+        value = self._values.get(key)
+        if value is None:
+            self._miss()
+        else:
+            self._values.move_to_end(key)
+            self._hit()
+        return value
+
+    def put(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+
+    # Values for every chromosome of `population`; `score` is only called on the distinct ones
+    # not in the cache.  Returns (values, number of chromosomes scored).
+    def evaluate(self, population, score):
+        values = np.empty(len(population), dtype=np.int64)
+        pending = {}  # key -> rows with that chromosome
+        for i, genes in enumerate(population):
+            key = self.key(genes)
+            if key in pending:
+                pending[key].append(i)
+                self._hit()
+                continue
+            value = self.get(key)
+            if value is None:
+                pending[key] = [i]
+            else:
+                values[i] = value
+        if pending:
+            first_rows = [rows[0] for rows in pending.values()]
+            for (key, rows), value in zip(pending.items(), score(population[first_rows])):
+                values[rows] = value
+                self.put(key, int(value))
+        return values, len(pending)
+
+    def end_generation(self):
+        self.history.append((self._generation_hits, self._generation_misses))
+        self._generation_hits = self._generation_misses = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def describe(self):
+        return (f"fitness cache: {self.hits} hits, {self.misses} misses ({self.hit_rate():.1%} hit rate), "
+                f"{len(self)} of {self.maxsize} entries")
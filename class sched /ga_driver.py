@@ -0,0 +1,241 @@
+import json
+import time
+import logging
+import argparse
+import numpy as np
+from generic_algorithm import (rnd, load_data, population, genetic_algorithm, Displaymanager, POPULATION_SIZE,
+                               mutation_rate, tournament_selection_size)
+from array_ga import GeneTables, ArrayGeneticAlgorithm
+from fitness_cache import FitnessCache
+
+# Evolution driver for either GA engine.  Each generation it measures population diversity (the
+# mean fraction of genes on which random pairs of schedules differ) and adapts the controls:
+# below the diversity band mutation goes up and the tournament shrinks (less selection
+# pressure), above it mutation goes down and the tournament grows.  It stops at zero
+# conflicts, after `plateau` generations without a better schedule, at the wall-clock budget or
+# after max_generations, and hands one statistics entry per generation to its consumers.
+
+logger = logging.getLogger(__name__)
+
+DIVERSITY_SAMPLE = 64  # schedule pairs compared per generation
+
+
+# Array engine (array_ga): the population is one gene array
+class ArrayRun:
+    def __init__(self, algorithm, genes=None):
+        self.algorithm = algorithm
+        self.population = algorithm.initial_population() if genes is None else genes
+        self.conflicts = algorithm.evaluate(self.population)
+
+    def step(self):
+        self.population, self.conflicts = self.algorithm.evolve(self.population, self.conflicts)
+
+    def genes(self):
+        return self.population
+
+    def evaluations(self):
+        return self.algorithm.evaluations
+
+    def controls(self):
+        return self.algorithm.mutation_rate, self.algorithm.tournament_size
+
+    def set_controls(self, mutation_rate, tournament_size):
+        self.algorithm.mutation_rate, self.algorithm.tournament_size = mutation_rate, tournament_size
+
+    def cache(self):
+        return self.algorithm.cache
+
+
+# Object engine (generic_algorithm): schedules of Class objects with incremental fitness
+class ObjectRun:
+    def __init__(self, algorithm, pop):
+        self.algorithm = algorithm
+        self.population = pop
+        self._evaluations = 0
+        self._score()
+
+    def _score(self):
+        self.conflicts = np.array([s.get_numbOfConflicts() for s in self.population.get_schedules()])
+        self._evaluations += len(self.conflicts)
+
+    def step(self):
+        self.population = self.algorithm.evolve(self.population)
+        self._score()
+
+    def genes(self):
+        return np.array([s.get_genes() for s in self.population.get_schedules()], dtype=object)
+
+    def evaluations(self):
+        return self._evaluations
+
+    def controls(self):
+        return self.algorithm.mutationRate, self.algorithm.tournamentSize
+
+    def set_controls(self, mutation_rate, tournament_size):
+        self.algorithm.mutationRate, self.algorithm.tournamentSize = mutation_rate, tournament_size
+
+    # Uncached: conflictCounter keeps every schedule's count up to date as classes are added or
+    # reassigned, so reading it is cheaper than hashing the chromosome for a lookup
+    def cache(self):
+        return None
+
+
+class EvolutionDriver:
+    def __init__(self, run, max_generations=1000, plateau=50, time_limit=None, adaptive=True,
+                 diversity_band=(0.05, 0.30), mutation_bounds=(0.001, 0.5), tournament_bounds=(2, 10),
+                 consumers=(), seed=None):
+        self.run = run
+        self.max_generations = max_generations
+        self.plateau = plateau
+        self.time_limit = time_limit
+        self.adaptive = adaptive
+        self.diversity_band = diversity_band
+        self.mutation_bounds = mutation_bounds
+        self.tournament_bounds = tournament_bounds
+        self.consumers = list(consumers)
+        self.rng = np.random.default_rng(seed)
+        self.history = []
+        self.stop_reason = None
+
+    def diversity(self):
+        genes = self.run.genes()
+        if len(genes) < 2:
+            return 0.0
+        pairs = self.rng.integers(0, len(genes), size=(DIVERSITY_SAMPLE, 2))
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        if not len(pairs):
+            return 0.0
+        return float((genes[pairs[:, 0]] != genes[pairs[:, 1]]).mean())
+
+    def adapt(self, diversity):
+        rate, size = self.run.controls()
+        low, high = self.diversity_band
+        if diversity < low:
+            rate, size = rate * 1.5, size - 1
+        elif diversity > high:
+            rate, size = rate / 1.5, size + 1
+        rate = min(max(rate, self.mutation_bounds[0]), self.mutation_bounds[1])
+        size = int(min(max(size, self.tournament_bounds[0]), self.tournament_bounds[1]))
+        self.run.set_controls(rate, size)
+
+    def _record(self, generation, started, last):
+        now = time.perf_counter()
+        conflicts = self.run.conflicts
+        rate, size = self.run.controls()
+        diversity = self.diversity()
+        evaluations = self.run.evaluations()
+        entry = {
+            "generation": generation,
+            "seconds": now - started,
+            "best_conflicts": int(conflicts.min()),
+            "best_fitness": 1.0 / (conflicts.min() + 1.0),
+            "mean_fitness": float((1.0 / (conflicts + 1.0)).mean()),
+            "diversity": diversity,
+            "mutation_rate": rate,
+            "tournament_size": size,
+            "evaluations_per_second": (evaluations - last[1]) / max(now - last[0], 1e-9),
+        }
+        cache = self.run.cache()
+        if cache is not None and cache.history:
+            entry["cache_hits"], entry["cache_misses"] = cache.history[-1]
+        self.history.append(entry)
+        logger.debug(json.dumps(entry))  # --stats (JsonLinesLog) is the way to keep them
+        for consumer in self.consumers:
+            consumer(entry)
+        return entry, (now, evaluations)
+
+    def evolve(self):
+        started = time.perf_counter()
+        entry, last = self._record(0, started, (started, 0))
+        best, best_generation = entry["best_conflicts"], 0
+        generation = 0
+        while True:
+            if best == 0:
+                self.stop_reason = "no conflicts"
+            elif generation - best_generation >= self.plateau:
+                self.stop_reason = f"no improvement for {self.plateau} generations"
+            elif self.time_limit is not None and entry["seconds"] >= self.time_limit:
+                self.stop_reason = "time limit"
+            elif generation >= self.max_generations:
+                self.stop_reason = "generation limit"
+            if self.stop_reason:
+                return self.stop_reason
+            if self.adaptive:
+                self.adapt(entry["diversity"])
+            self.run.step()
+            generation += 1
+            entry, last = self._record(generation, started, last)
+            if entry["best_conflicts"] < best:
+                best, best_generation = entry["best_conflicts"], generation
+
+
+# One JSON object per generation
+class JsonLinesLog:
+    def __init__(self, path):
+        self.path = path
+        open(path, "w").close()
+
+    def __call__(self, entry):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def print_generation(entry):
+    print(f"gen {entry['generation']:5d} {entry['seconds']:7.2f}s best {entry['best_conflicts']:4d} "
+          f"mean fitness {entry['mean_fitness']:.4f} diversity {entry['diversity']:.3f} "
+          f"mutation {entry['mutation_rate']:.4f} tournament {entry['tournament_size']} "
+          f"{entry['evaluations_per_second']:.0f} evals/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the genetic algorithm until it converges or runs out of time")
+    parser.add_argument("--engine", choices=["array", "object"], default="array")
+    parser.add_argument("--population-size", type=int, help=f"default: 1000 (array), {POPULATION_SIZE} (object)")
+    parser.add_argument("--generations", type=int, default=1000, help="maximum number of generations")
+    parser.add_argument("--plateau", type=int, default=50, help="stop after this many generations without improvement")
+    parser.add_argument("--time-limit", type=float, help="wall-clock budget in seconds")
+    parser.add_argument("--mutation-rate", type=float, default=mutation_rate, help="initial mutation rate")
+    parser.add_argument("--tournament-size", type=int, default=tournament_selection_size, help="initial tournament size")
+    parser.add_argument("--no-adapt", action="store_true", help="keep mutation rate and tournament size fixed")
+    parser.add_argument("--cache-size", type=int, default=0, help="fitness cache entries (array engine)")
+    parser.add_argument("--stats", metavar="JSONL", help="write per-generation statistics to this file")
+    parser.add_argument("--quiet", action="store_true", help="do not print every generation")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    if args.cache_size and args.engine == "object":
+        parser.error("--cache-size only applies to the array engine")
+
+    data = load_data()
+    if args.engine == "array":
+        tables = GeneTables(data)
+        algorithm = ArrayGeneticAlgorithm(tables, args.population_size or 1000, mutation_rate=args.mutation_rate,
+                                          tournament_size=args.tournament_size, seed=args.seed,
+                                          cache=FitnessCache(args.cache_size) if args.cache_size else None)
+        run = ArrayRun(algorithm)
+    else:
+        if args.seed is not None:
+            rnd.seed(args.seed)
+        display_manager = Displaymanager(data)
+        display_manager.print_available_data()
+        algorithm = genetic_algorithm(args.population_size or POPULATION_SIZE, args.mutation_rate, args.tournament_size)
+        run = ObjectRun(algorithm, population(algorithm.populationSize, data))
+
+    consumers = ([JsonLinesLog(args.stats)] if args.stats else []) + ([] if args.quiet else [print_generation])
+    driver = EvolutionDriver(run, args.generations, args.plateau, args.time_limit, not args.no_adapt,
+                             consumers=consumers, seed=args.seed)
+    reason = driver.evolve()
+    last = driver.history[-1]
+    print(f"stopped after {last['generation']} generations ({reason}): best schedule has "
+          f"{last['best_conflicts']} conflicts, {last['seconds']:.2f}s")
+
+    best = int(np.argmin(run.conflicts))
+    if args.engine == "array":
+        for dept, course, meetingTime, room, instructor in tables.describe(run.population[best]):
+            print(f"{dept.get_name()} {course.get_courseNumber()} {room.get_number()} ({room.get_seatingCapacity()}) "
+                  f"{instructor.get_id()} {meetingTime.get_id()} ({meetingTime.get_time()})")
+    else:
+        display_manager.print_schedule_as_table(run.population.get_schedules()[best])
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,29 @@ from enum import Enum
 import pandas as pd
 import os
 import logging
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, filename="data_loader.log", filemode="a",
-                    format="%(asctime)s - %(levelname)s - %(message)s")
+from types import MappingProxyType
 
 POPULATION_SIZE = 9
 number_of_elite_schedules = 1
 mutation_rate = 0.1
 tournament_selection_size = 3
 
+# The GA dataset is read once per process (load_data) and then frozen: every schedule and
+# population holds a reference to the same read-only Data.  Worker processes inherit it through
+# fork, so spreadsheets are never parsed again after startup.
+_shared_data = None
+
+
+def load_data():
+    global _shared_data
+    if _shared_data is None:
+        _shared_data = Data().freeze()
+    return _shared_data
+
+
 class Data:
     def __init__(self):
+        self._frozen = False
         self._rooms = []
         self._meetingTimes = []
         self._instructors = []
@@ -39,6 +50,24 @@ class Data:
             logging.error(f"An error occurred during data initialization: {e}")
             raise
 
+    # Lists become tuples and later attribute assignments raise, so the shared dataset cannot be
+    # changed through one schedule behind the others' backs
+    def freeze(self):
+        self._rooms = tuple(self._rooms)
+        self._meetingTimes = tuple(self._meetingTimes)
+        self._instructors = tuple(self._instructors)
+        self._courses = tuple(self._courses)
+        self._depts = tuple(self._depts)
+        self._teaching_assistants = tuple(self._teaching_assistants)
+        self._instructor_availability = {k: tuple(v) for k, v in self._instructor_availability.items()}
+        self._frozen = True
+        return self
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("the GA dataset is shared and read-only")
+        super().__setattr__(name, value)
+
     def load_rooms(self):
         try:
             rooms_file = "/Users/justiineazigi/Documents/Data/room.xlsx"
@@ -162,8 +191,10 @@ class Data:
             for col in required_cols:
                 if col not in departments_df.columns:
                     raise KeyError(f"Departments file is missing required column: {col}")
+            courses = {str(c.get_courseNumber()).strip(): c for c in self._courses}
             self._depts = [
-                department(row["DepartmentName"], row["CourseNumbers"])
+                department(row["DepartmentName"], [courses[number.strip()] for number in str(row["CourseNumbers"]).split(",")
+                                                   if number.strip() in courses])
                 for _, row in departments_df.iterrows()
                 if not pd.isnull(row["DepartmentName"]) and not pd.isnull(row["CourseNumbers"])
             ]         
@@ -195,98 +226,142 @@ class Data:
             logging.error(f"Error loading instructor availability: {e}")
             raise
     def get_instructor_availability(self):
-        return self._instructor_availability
+        return MappingProxyType(self._instructor_availability)
     ''''''
 class schedule:
-    def __init__(self):
-        self.data = Data()
+    def __init__(self, data=None):
+        self.data = data if data is not None else load_data()
         self.classes = []
         self._numbOfConflicts = 0
         self._fitness = -1
         self._classNumb = 0
         self._isFitnessChanged = True
-    
-    def inintialize (self):
-        depts = self.data.get_depts()
-        for depts in depts:
-            for courses in depts.get_courses():
-                newClass = Class(self._classNumb, depts, courses)
+        self._conflicts = conflictCounter()
+
+    def initialize(self):
+        for dept in self.data.get_depts():
+            for course in dept.get_courses():
+                newClass = Class(self._classNumb, dept, course)
                 self._classNumb += 1
-                newClass.set_meetingTime(rnd.choice(Data.get_meetingTimes()))
-                newClass.set_room(rnd.choice(Data.get_rooms()))
-                newClass.set_instructor(rnd.choice(Data.get_instructors()))
-                self.classes.append(newClass)
+                newClass.set_meetingTime(rnd.choice(self.data.get_meetingTimes()))
+                newClass.set_room(rnd.choice(self.data.get_rooms()))
+                newClass.set_instructor(rnd.choice(self.data.get_instructors()))
+                self.add_class(newClass)
         return self
-    
-    def calculate_fitness(self):
-        for i, class1 in enumerate(self.classes):
-            if (class1.get_room().get_seatingCapacity() < class1.get_course().get_maxNumbOfStudents()):
-                self._numbOfConflicts += 1
-            for class2 in self.classes[i+1:]:
-                    if (class1.get_meetingTime() == class2.get_meetingTime() and class1.get_id() != class2.get_id()):
-                        if (class1.get_room() == class2.get_room()): self._numbOfConflicts += 1
-                        if (class1.get_instructor() == class2.get_instructor()): self._numbOfConflicts += 1
-
-        self._fitness = 1 / (1.0 * self._numbOfConflicts + 1)
-        self._isFitnessChanged = False
+
+    def get_classes(self):
+        return self.classes
+
+    def add_class(self, newClass):
+        self.classes.append(newClass)
+        self._conflicts.add(newClass)
+        self._isFitnessChanged = True
+
+    # Changes the genes of one class; the conflict counters are updated in O(1)
+    def reassign(self, class_obj, meetingTime=None, room=None, instructor=None):
+        self._conflicts.remove(class_obj)
+        if meetingTime is not None:
+            class_obj.set_meetingTime(meetingTime)
+        if room is not None:
+            class_obj.set_room(room)
+        if instructor is not None:
+            class_obj.set_instructor(instructor)
+        self._conflicts.add(class_obj)
+        self._isFitnessChanged = True
+
+    def get_numbOfConflicts(self):
+        self.get_fitness()
+        return self._numbOfConflicts
+
+    # Fitness from the running conflict counters, only refreshed after a change
+    def get_fitness(self):
+        if self._isFitnessChanged:
+            self._numbOfConflicts = self._conflicts.get_numbOfConflicts()
+            self._fitness = 1 / (1.0 * self._numbOfConflicts + 1)
+            self._isFitnessChanged = False
         return self._fitness
+
+    # (meeting time id, room number, instructor id) of every class
+    def get_genes(self):
+        return [(c.get_meetingTime().get_id(), c.get_room().get_number(), c.get_instructor().get_id())
+                for c in self.classes]
+
+    # Recounts every conflict from scratch
+    def calculate_fitness(self):
+        self._conflicts = conflictCounter()
+        for class_obj in self.classes:
+            self._conflicts.add(class_obj)
+        self._isFitnessChanged = True
+        return self.get_fitness()
     ''''''
 
 class population:
-    def __init__(self, size):
+    def __init__(self, size, data=None):
         self._size = size
-        self._data = Data()
+        self._data = data if data is not None else load_data()
         self._schedules = []
         for i in range(size):
-            self._schedules.append(schedule().initialize())
+            self._schedules.append(schedule(self._data).initialize())
+
+    def get_schedules(self):
+        return self._schedules
+
+    def get_data(self):
+        return self._data
     ''''''
 class genetic_algorithm:
+    # The module constants are the defaults; ga_driver adapts mutationRate and tournamentSize per run
+    def __init__(self, populationSize=POPULATION_SIZE, mutationRate=mutation_rate,
+                 tournamentSize=tournament_selection_size, eliteSchedules=number_of_elite_schedules):
+        self.populationSize = populationSize
+        self.mutationRate = mutationRate
+        self.tournamentSize = tournamentSize
+        self.eliteSchedules = eliteSchedules
+
     def evolve(self, population):
         return self._mutate_population(self._crossover_population(population))
-    
-    def _crossover_population(self, population):
-        crossoverPopulation = population(0)
-        for i in range(number_of_elite_schedules):
-            crossoverPopulation.get_schedules().append(population.get_schedules()[i])
-        for i in range(number_of_elite_schedules, POPULATION_SIZE):
-            parent1 = self._select_tournament_population(population)
-            parent2 = self._select_tournament_population(population)
+
+    def _crossover_population(self, pop):
+        crossoverPopulation = population(0, pop.get_data())
+        ranked = sorted(pop.get_schedules(), key=lambda s: s.get_fitness(), reverse=True)
+        for i in range(self.eliteSchedules):
+            crossoverPopulation.get_schedules().append(ranked[i])
+        for i in range(self.eliteSchedules, self.populationSize):
+            parent1 = self._select_tournament_population(pop)
+            parent2 = self._select_tournament_population(pop)
             crossoverPopulation.get_schedules().append(self._crossover_schedule(parent1, parent2))
         return crossoverPopulation
-    
-    
-    def _mutate_population(self, population):
-        for i in range(number_of_elite_schedules), len(population.get_schedules()):
-            self._mutate_schedule(population.get_schedules()[i])
-        return population
-    
+
+    def _mutate_population(self, pop):
+        for i in range(self.eliteSchedules, len(pop.get_schedules())):
+            self._mutate_schedule(pop.get_schedules()[i])
+        return pop
+
+    # The child gets copies of its parents' classes, so mutating it leaves the parents intact
     def _crossover_schedule(self, schedule1, schedule2):
-        child = schedule1.initialize()
-        for i in range(len(child.get_classes())):
-            if (rnd.random() > 0.5):
-                child.get_classes()[i] = schedule1.get_classes()[i]
-            else:
-                child.get_classes()[i] = schedule2.get_classes()[i]
+        child = schedule(schedule1.data)
+        for class1, class2 in zip(schedule1.get_classes(), schedule2.get_classes()):
+            child.add_class((class1 if rnd.random() > 0.5 else class2).copy())
         return child
-    
+
     def _mutate_schedule(self, mutateSchedule):
-        for class_obj in schedule.get_classes():
-            if rnd.random() < mutation_rate:
-                class_obj.set_meetingTime(rnd.choice(Data.get_meetingTimes()))
-                class_obj.set_room(rnd.choice(Data.get_rooms()))
-                class_obj.set_instructor(rnd.choice(Data.get_instructors()))
+        data = mutateSchedule.data
+        for class_obj in mutateSchedule.get_classes():
+            if rnd.random() < self.mutationRate:
+                mutateSchedule.reassign(class_obj, rnd.choice(data.get_meetingTimes()), rnd.choice(data.get_rooms()),
+                                        rnd.choice(data.get_instructors()))
         return mutateSchedule
 
-    def _select_tournament_population(self, population):
-        tournamentPopulation = population(tournament_selection_size)
-        for _ in range(tournament_selection_size):
+    def _select_tournament_population(self, pop):
+        tournamentPopulation = population(0, pop.get_data())
+        for _ in range(self.tournamentSize):
             tournamentPopulation.get_schedules().append(
-                rnd.choice(population.get_schedules())
+                rnd.choice(pop.get_schedules())
             )
-                
-        tournamentPopulation.get_schedules().sort(key = lambda s: s.calculate_fitness(), reverse = True)
+
+        tournamentPopulation.get_schedules().sort(key = lambda s: s.get_fitness(), reverse = True)
         return tournamentPopulation.get_schedules()[0]
-    
+
     ''''''
 class course:
     def __init__(self, courseNumber, courseName, InstructorID, maxStudents, meetingTime):
@@ -306,7 +381,7 @@ class course:
     def get_meetingTime(self):
         return self.meetingTime
     def __str__(self):
-        return self.courseNumber + " " + self.courseName
+        return str(self.courseNumber) + " " + str(self.courseName)
     ''''''
 class room:
     def __init__(self, number, seatingCapacity):
@@ -352,6 +427,7 @@ class Class:
         self.course = course
         self.meetingTime = None
         self.room = None
+        self.instructor = None
     def get_id(self):
         return self.id
     def get_dept(self):
@@ -366,9 +442,17 @@ class Class:
         self.meetingTime = meetingTime
     def set_room(self, room):
         self.room = room
+    def get_instructor(self):
+        return self.instructor
+    def set_instructor(self, instructor):
+        self.instructor = instructor
+    def copy(self):
+        newClass = Class(self.id, self.dept, self.course)
+        newClass.meetingTime, newClass.room, newClass.instructor = self.meetingTime, self.room, self.instructor
+        return newClass
     def __str__(self):
-        return self.dept.get_name() + " " + self.course.get_number() + " " + \
-            str(self.room.get_number()) + " " + str(self._instructor.get_id()) + " " + str(self.meetingTime.get_id())
+        return self.dept.get_name() + " " + str(self.course.get_courseNumber()) + " " + \
+            str(self.room.get_number()) + " " + str(self.instructor.get_id()) + " " + str(self.meetingTime.get_id())
         
 
     ''''''
@@ -394,6 +478,52 @@ class conflict:
             return self.conflictType
         def get_conflictBetweenClasses(self):
             return self.conflictBetweenClasses
+# Occupancy counters behind the GA fitness.  Every pair of classes sharing a meeting time and a
+# room, or a meeting time and an instructor, is one conflict, as is every class whose room is
+# smaller than its course; with n classes on one key that key holds n*(n-1)/2 conflicts, so
+# adding or removing a class changes the total by the key's count and costs O(1).
+class conflictCounter:
+    def __init__(self):
+        self.roomBookings = {}        # (meetingTime id, room number) -> number of classes
+        self.instructorBookings = {}  # (meetingTime id, instructor id) -> number of classes
+        self.capacityViolations = 0
+        self._numbOfConflicts = 0
+
+    @staticmethod
+    def _keys(class_obj):
+        meetingTime = class_obj.get_meetingTime().get_id()
+        return (meetingTime, class_obj.get_room().get_number()), (meetingTime, class_obj.get_instructor().get_id())
+
+    @staticmethod
+    def _over_capacity(class_obj):
+        return class_obj.get_room().get_seatingCapacity() < class_obj.get_course().get_maxStudents()
+
+    def add(self, class_obj):
+        roomKey, instructorKey = self._keys(class_obj)
+        for bookings, key in ((self.roomBookings, roomKey), (self.instructorBookings, instructorKey)):
+            count = bookings.get(key, 0)
+            self._numbOfConflicts += count
+            bookings[key] = count + 1
+        if self._over_capacity(class_obj):
+            self.capacityViolations += 1
+            self._numbOfConflicts += 1
+
+    def remove(self, class_obj):
+        roomKey, instructorKey = self._keys(class_obj)
+        for bookings, key in ((self.roomBookings, roomKey), (self.instructorBookings, instructorKey)):
+            count = bookings[key] - 1
+            self._numbOfConflicts -= count
+            if count:
+                bookings[key] = count
+            else:
+                del bookings[key]
+        if self._over_capacity(class_obj):
+            self.capacityViolations -= 1
+            self._numbOfConflicts -= 1
+
+    def get_numbOfConflicts(self):
+        return self._numbOfConflicts
+
 class Displaymanager:
     def __init__(self, data):
         self.data = data
@@ -409,15 +539,14 @@ class Displaymanager:
     def print_depts(self):
         print("departments:")
         for department in self.data.get_depts():
-            print("name: ", department.get_name(), " courses: ", department.get_courses())
+            print("name: ", department.get_name(), " courses: ", [str(c.get_courseNumber()) for c in department.get_courses()])
         print("")
         
     def print_course(self):
         print("courses:")
-        for course in self.data.get_courses():           
-            instructors = [instructor.get_name() for instructor in course.get_instructors()]
-            print(f"-{course.get_number()}: {course.get_name()}"
-                  f" (max # of students: {course.get_maxNumbOfStudents()}, instructors: {','.join (instructors)})")
+        for course in self.data.get_courses():
+            print(f"-{course.get_courseNumber()}: {course.get_courseName()}"
+                  f" (max # of students: {course.get_maxStudents()}, instructor: {course.get_instructorID()})")
         print("")
         
     def print_instructor(self):
@@ -442,7 +571,7 @@ class Displaymanager:
         print(f"\n> Generation # {generation_number}")
         print("schedules:")
         for i, schedule in enumerate(population.get_schedules()):
-            print(f"schedule #{i+1}: Fitness= {schedule.calculate_fitness():.4f}")
+            print(f"schedule #{i+1}: Fitness= {schedule.get_fitness():.4f}")
         print("")
 
     
@@ -451,26 +580,26 @@ class Displaymanager:
         table = prettytable.PrettyTable(['Class #', 'Dept', 'Course (number, max # of students)', 'Room (Capacity)', 'Instructor (ID)', 'Meeting Time (ID)'])
         for i in range(len(classes)):
             table.add_row([str(i), classes[i].get_dept().get_name(), classes[i].get_course().__str__(), \
-                classes[i].get_room().get_number() + " (" + str(classes[i].get_room().get_seatingCapacity()) + ")", \
-                classes[i].get_instructor().get_id(), classes[i].get_meetingTime().get_id() + " (" + classes[i].get_meetingTime().get_time() + ")"])
+                str(classes[i].get_room().get_number()) + " (" + str(classes[i].get_room().get_seatingCapacity()) + ")", \
+                classes[i].get_instructor().get_id(), str(classes[i].get_meetingTime().get_id()) + " (" + str(classes[i].get_meetingTime().get_time()) + ")"])
         print(table)
 
 
     def print_final_solution(self, population):
         
-        best_schedule = max(population.get_schedules(), key=lambda s: s.calculate_fitness())
+        best_schedule = max(population.get_schedules(), key=lambda s: s.get_fitness())
         print("Final Solution (Best Schedule):")
         self.print_schedule_as_table(best_schedule)
 
 
+# Generation loop and stopping rules live in ga_driver
 if __name__ == "__main__":
-    data = Data()
-    display_manager = Displaymanager(data)
-    display_manager.print_available_data()
-    generation_number = 0
-    population = population(POPULATION_SIZE)  
-    display_manager.print_generation(generation_number, population)
-    display_manager.print_final_solution(population)
+    import sys
+    from ga_driver import main
+    # Configure logging (only when run as a script: importing the GA leaves logging alone)
+    logging.basicConfig(level=logging.INFO, filename="data_loader.log", filemode="a",
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    main(["--engine", "object"] + sys.argv[1:])
 
 
 
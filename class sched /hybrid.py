@@ -0,0 +1,206 @@
+import time
+import numpy as np
+from ortools.sat.python import cp_model
+from final import solution_rows
+from array_ga import ArrayGeneticAlgorithm
+from ga_driver import ArrayRun, EvolutionDriver
+from soft_constraints import hint_solution
+from solver_config import SolverConfig, solve
+
+# Hybrid GA / CP-SAT search on the Boolean schedule model.  The GA chromosome holds one gene
+# per course: the index of its chosen candidate slot.  A chromosome is decoded into a full
+# assignment of the model's variables (penalty literals of conjunctions follow from the chosen
+# slots) and scored against the model itself: every violated clause, at-most-one, exactly-one or
+# unit of linear excess counts hard_weight (more than the whole objective) above the objective,
+# so a feasible schedule always beats an infeasible one and feasible schedules compare by the
+# CP-SAT objective.
+# Each round the GA runs for a short budget, its best schedule becomes the CP-SAT hint, and
+# every solution CP-SAT finds (intermediate ones included) replaces one of the GA's worst
+# schedules, to be kept as elites and recombined in the next round.
+
+LINEAR_BOUND = 1 << 40  # open linear bounds (+-2^63) are clipped so excesses cannot overflow
+
+
+def _has(ct, field):
+    has = getattr(ct, "has_" + field, None)  # pybind protos (OR-Tools >= 9.12)
+    return has() if has is not None else ct.HasField(field)
+
+
+class ModelEvaluator:
+    def __init__(self, schedule):
+        proto = schedule.model.Proto()
+        self.num_vars = len(proto.variables)
+        registry = schedule.registry
+        self.courses = registry.courses.names()
+        candidates = [[lit.Index() for lit in registry.course_literals(c)] for c in self.courses]
+        self.counts = np.array([len(c) for c in candidates], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+        self.candidates = np.array([v for c in candidates for v in c], dtype=np.int64)
+        self.conjunctions = np.array([(p.Index(), a.Index(), b.Index()) for p, a, b in schedule.conjunctions],
+                                     dtype=np.int64).reshape(-1, 3)
+
+        # Boolean constraints as flat literal lists with group starts
+        self.groups = {}
+        for field in ("bool_or", "at_most_one", "exactly_one"):
+            literals, starts = [], []
+            for ct in proto.constraints:
+                if _has(ct, field) and not len(ct.enforcement_literal):
+                    lits = list(getattr(ct, field).literals)
+                    if lits:
+                        starts.append(len(literals))
+                        literals += lits
+            literals = np.array(literals, dtype=np.int64)
+            self.groups[field] = (np.where(literals < 0, -literals - 1, literals), literals < 0,
+                                  np.array(starts, dtype=np.int64))
+
+        # Unconditional linear constraints (e.g. room capacity classes) the same way, with their
+        # bounds; holes in a domain are not scored
+        variables, coeffs, starts, bounds = [], [], [], []
+        for ct in proto.constraints:
+            if _has(ct, "linear") and not len(ct.enforcement_literal) and len(ct.linear.vars):
+                starts.append(len(variables))
+                variables += list(ct.linear.vars)
+                coeffs += list(ct.linear.coeffs)
+                domain = list(ct.linear.domain)  # pybind repeated fields do not take negative indexes
+                bounds.append((domain[0], domain[-1]))
+        self.linear = (np.array(variables, dtype=np.int64), np.array(coeffs, dtype=np.int64),
+                       np.array(starts, dtype=np.int64),
+                       np.clip(np.array(bounds, dtype=np.int64).reshape(-1, 2), -LINEAR_BOUND, LINEAR_BOUND))
+
+        objective = proto.objective
+        refs = np.array(list(objective.vars), dtype=np.int64)
+        coeffs = np.array(list(objective.coeffs), dtype=np.int64)
+        self.objective_vars = np.where(refs < 0, -refs - 1, refs)
+        self.objective_coeffs = np.where(refs < 0, -coeffs, coeffs)
+        self.objective_offset = float(objective.offset)
+        # Larger than any objective value, so one violation outweighs every soft penalty
+        self.hard_weight = int(np.abs(coeffs).sum()) + 1
+
+    # (population, courses) candidate indexes -> (population, variables) 0/1 assignment
+    def decode(self, genes):
+        values = np.zeros((len(genes), self.num_vars), dtype=np.int8)
+        chosen = self.candidates[self.offsets[None, :] + genes]
+        values[np.arange(len(genes))[:, None], chosen] = 1
+        if len(self.conjunctions):
+            p, a, b = self.conjunctions.T
+            values[:, p] = values[:, a] & values[:, b]
+        return values
+
+    # Full solution vector (e.g. CpSolverResponse.solution) -> chromosome
+    def encode(self, solution):
+        solution = np.asarray(solution, dtype=np.int64)
+        return np.array([int(np.argmax(solution[self.candidates[o:o + n]])) if n else 0
+                         for o, n in zip(self.offsets, self.counts)], dtype=np.int32)
+
+    def _group_sums(self, values, field):
+        variables, negated, starts = self.groups[field]
+        if not len(starts):
+            return np.zeros((len(values), 0), dtype=np.int64)
+        literal_values = values[:, variables].astype(np.int64)
+        literal_values[:, negated] = 1 - literal_values[:, negated]
+        return np.add.reduceat(literal_values, starts, axis=1)
+
+    def _linear_excess(self, values):
+        variables, coeffs, starts, bounds = self.linear
+        if not len(starts):
+            return np.zeros(len(values), dtype=np.int64)
+        sums = np.add.reduceat(values[:, variables].astype(np.int64) * coeffs, starts, axis=1)
+        return (np.maximum(bounds[:, 0] - sums, 0) + np.maximum(sums - bounds[:, 1], 0)).sum(axis=1)
+
+    def violations(self, values):
+        return (self._linear_excess(values) + (self._group_sums(values, "bool_or") == 0).sum(axis=1)
+                + np.maximum(self._group_sums(values, "at_most_one") - 1, 0).sum(axis=1)
+                + np.abs(self._group_sums(values, "exactly_one") - 1).sum(axis=1))
+
+    def objective(self, values):
+        return values[:, self.objective_vars].astype(np.int64) @ self.objective_coeffs
+
+    def score(self, genes):
+        values = self.decode(genes)
+        return self.hard_weight * self.violations(values) + self.objective(values)
+
+
+class SlotGeneTables:
+    # Gene tables for ArrayGeneticAlgorithm: one gene per course, bounded by its number of candidates
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+
+    def num_classes(self):
+        return len(self.evaluator.courses)
+
+    def random_genes(self, shape, rng, classes=None):
+        counts = self.evaluator.counts if classes is None else self.evaluator.counts[classes]
+        return (rng.random(tuple(shape)) * np.maximum(counts, 1)).astype(np.int32)[..., None]
+
+    def count_conflicts(self, population):
+        return self.evaluator.score(population[..., 0])
+
+
+class SolutionCollector(cp_model.CpSolverSolutionCallback):
+    # Chromosomes of every solution CP-SAT reports during a solve
+    def __init__(self, evaluator):
+        super().__init__()
+        self.evaluator = evaluator
+        self.chromosomes = []
+
+    def on_solution_callback(self):
+        self.chromosomes.append(self.evaluator.encode(self.Response().solution))
+
+    OnSolutionCallback = on_solution_callback
+
+
+# Returns (status, rows, rounds); rounds lists per-round GA and CP-SAT results.  The solver
+# config's time limit applies to each CP-SAT round.
+def solve_hybrid(schedule, config=None, rounds=3, ga_seconds=5.0, population_size=200, seed=None, consumers=()):
+    config = config or SolverConfig()
+    model = schedule.model
+    evaluator = ModelEvaluator(schedule)
+    algorithm = ArrayGeneticAlgorithm(SlotGeneTables(evaluator), population_size, elites=2, seed=seed)
+    run = ArrayRun(algorithm)
+    history = []
+    best_status, best_solution, best_objective = cp_model.UNKNOWN, None, None
+
+    for round_number in range(1, rounds + 1):
+        started = time.perf_counter()
+        EvolutionDriver(run, time_limit=ga_seconds, consumers=consumers, seed=seed).evolve()
+        ga_best = int(np.argmin(run.conflicts))
+        ga_values = evaluator.decode(run.population[ga_best:ga_best + 1, :, 0])[0]
+        ga_feasible = int(evaluator.violations(ga_values[None, :])[0]) == 0
+        entry = {"round": round_number, "ga_seconds": time.perf_counter() - started,
+                 "ga_feasible": ga_feasible, "ga_objective": int(evaluator.objective(ga_values[None, :])[0])}
+        if ga_feasible and (best_objective is None or entry["ga_objective"] < best_objective):
+            best_status, best_solution, best_objective = cp_model.FEASIBLE, ga_values, entry["ga_objective"]
+
+        hint_solution(model, ga_values)
+        collector = SolutionCollector(evaluator)
+        solver, status = solve(model, config, collector)
+        model.ClearHints()
+        entry.update(cp_status=solver.StatusName(status), cp_seconds=solver.WallTime(),
+                     cp_solutions=len(collector.chromosomes))
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            objective = int(round(solver.ObjectiveValue()))
+            entry["cp_objective"] = objective
+            if best_objective is None or objective <= best_objective or status == cp_model.OPTIMAL:
+                best_status, best_solution, best_objective = status, np.array(solver.ResponseProto().solution), objective
+        history.append(entry)
+        if status in (cp_model.OPTIMAL, cp_model.INFEASIBLE, cp_model.MODEL_INVALID):
+            if status != cp_model.OPTIMAL:
+                best_status = status
+            break
+
+        # CP-SAT solutions replace the GA's worst schedules and survive as elites
+        if collector.chromosomes:
+            injected = np.array(collector.chromosomes[-population_size // 2:])[..., None]
+            worst = np.argsort(run.conflicts, kind="stable")[::-1][:len(injected)]
+            run.population[worst] = injected
+            run.conflicts[worst] = algorithm.evaluate(injected)
+
+    rows = solution_rows(schedule.registry, best_solution) if best_solution is not None else []
+    return best_status, rows, history
+
+
+def describe_round(entry):
+    ga = f"GA {'feasible' if entry['ga_feasible'] else 'infeasible'}, objective {entry['ga_objective']}"
+    cp = f"CP-SAT {entry['cp_status']} ({entry['cp_solutions']} solutions"
+    cp += f", objective {entry['cp_objective']})" if "cp_objective" in entry else ")"
+    return f"round {entry['round']}: {ga}; {cp}"
@@ -0,0 +1,226 @@
+import time
+import pandas as pd
+from ortools.sat.python import cp_model
+from final import BooleanScheduleModel, load_inputs, days_of_week, parse_days
+from solver_config import SolverConfig, solve
+from soft_constraints import clear_constraint
+
+
+class IncrementalScheduler:
+    # Long-lived scheduler for mid-semester changes.  The model is built once; each constraint
+    # family is built per scope (course, person or program) and the constraint index ranges it
+    # produced are remembered, so a delta clears and rebuilds only the scopes it touches.
+    # Removed courses keep their literals in the registry but have them forbidden; a course added
+    # back with an instructor/TA, days and meeting pattern it had before gets those literals
+    # back instead of new ones.  Domains are not pruned: a relaxed preference must find the
+    # literals it re-allows already in the model.
+    def __init__(self, inputs=None, config=None, hard_externals=True):
+        self.schedule = BooleanScheduleModel(inputs if inputs is not None else load_inputs(), prune=False,
+                                             hard_externals=hard_externals)
+        self.model = self.schedule.model
+        self.registry = self.schedule.registry
+        self.config = config or SolverConfig()
+        self._ranges = {}        # scope key -> [(first, last) constraint index ranges]
+        self._penalties = {}     # scope key -> penalty literals
+        self._conjunctions = {}  # scope key -> penalty literal indexes of its conjunctions
+        self._blocks = {}        # (slot_id, course) -> constraint indexes
+        self._dormant = {}       # course -> {(person, days, credit hours, meeting time): forbidden literal indexes}
+        self._dirty = set()      # courses whose assignment may change on the next solve
+        self.assignment = {}     # course -> chosen literal
+        self._build()
+
+    def _record(self, key, build, *args):
+        first = len(self.model.Proto().constraints)
+        conjunctions = self.schedule.conjunctions
+        first_conjunction = len(conjunctions)
+        penalties = build(*args)
+        self._ranges.setdefault(key, []).append((first, len(self.model.Proto().constraints)))
+        if penalties:
+            self._penalties.setdefault(key, []).extend(penalties)
+        if len(conjunctions) > first_conjunction:
+            self._conjunctions.setdefault(key, set()).update(p.Index() for p, _, _ in conjunctions[first_conjunction:])
+
+    def _clear(self, key):
+        for first, last in self._ranges.pop(key, []):
+            for index in range(first, last):
+                clear_constraint(self.model, index)
+        self._penalties.pop(key, None)
+        # the penalty literals of cleared conjunctions are free now; hybrid.ModelEvaluator and
+        # auxiliary_hints must not derive them from the decision literals any more
+        stale = self._conjunctions.pop(key, None)
+        if stale:
+            self.schedule.conjunctions = [c for c in self.schedule.conjunctions if c[0].Index() not in stale]
+
+    def _rebuild(self, key):
+        family, scope = key
+        self._clear(key)
+        builders = {
+            "once": self.schedule.add_once_per_day,
+            "conflicts": self.schedule.add_person_conflicts,
+            "preferences": self.schedule.add_time_preferences,
+            "breaks": self.schedule.add_break_penalties,
+            "required": self.schedule.add_required_conflicts,
+            "elective_overlap": self.schedule.add_elective_penalties,
+            "external": self.schedule.add_external_penalties,
+            "rooms": self.schedule.add_room_capacity,
+        }
+        self._record(key, builders[family], [scope])
+
+    def _build(self):
+        schedule = self.schedule
+        schedule.add_decision_variables()
+        for course in self.registry.courses.names():
+            self._rebuild(("once", course))
+        for person in schedule.persons():
+            for family in ("conflicts", "preferences", "breaks"):
+                self._rebuild((family, person))
+        for program in schedule.inputs["specialization"].index:
+            for family in ("required", "elective_overlap", "external"):
+                self._rebuild((family, program))
+        if schedule.rooms is not None:
+            for day in days_of_week:
+                self._rebuild(("rooms", day))
+        self._set_objective()
+
+    def _set_objective(self):
+        self.schedule.penalties = {}
+        for (family, _), penalties in self._penalties.items():
+            self.schedule.penalties.setdefault(family, []).extend(penalties)
+        self.schedule.set_objective()
+
+    def _programs_with(self, course):
+        specialization = self.schedule.inputs["specialization"]
+        return [label for label, row in specialization.iterrows()
+                if course in row["required_courses"] or course in row["elective_courses"]]
+
+    def _refresh_course(self, course, person, days, new_literals=True):
+        if new_literals:
+            self.schedule.add_decision_variables([course])
+        self._rebuild(("once", course))
+        for family in ("conflicts", "preferences", "breaks"):
+            self._rebuild((family, person))
+        for program in self._programs_with(course):
+            for family in ("required", "elective_overlap", "external"):
+                self._rebuild((family, program))
+        if self.schedule.rooms is not None:
+            for day in parse_days(days):
+                self._rebuild(("rooms", day))
+        self._dirty.add(course)
+
+    # Deltas
+
+    def _forbid(self, literals):
+        for lit in literals:
+            self.schedule.emit.forbid(lit)
+
+    def add_course(self, course, person, days, credit_hours, meeting_time, ta=False, max_students=0):
+        inputs = self.schedule.inputs
+        shape = (person, tuple(parse_days(days)), credit_hours, meeting_time)
+        reuse = shape in self._dormant.get(course, {})
+        if reuse:
+            del self._dormant[course][shape]
+            self._clear(("removed", course, shape))
+        if ta:
+            row = {"course_code": course, "credit_hours": credit_hours, "Days": days,
+                   "contact_minutes": None, "TA_ID": person, "meeting_time": meeting_time, "MaxStudents": max_students}
+            inputs["intro_courses"] = pd.concat([inputs["intro_courses"], pd.DataFrame([row])], ignore_index=True)
+        else:
+            row = {"course_code": course, "credit_hours": credit_hours, "Days": days, "Contact_minutes": None,
+                   "instructor_id": None, "instructor_name": person, "meeting_time": meeting_time,
+                   "MaxStudents": max_students}
+            inputs["fall_courses"] = pd.concat([inputs["fall_courses"], pd.DataFrame([row])], ignore_index=True)
+        self._refresh_course(course, person, days, new_literals=not reuse)
+
+    def remove_course(self, course):
+        inputs = self.schedule.inputs
+        shape = None
+        for name, person in (("fall_courses", "instructor_name"), ("intro_courses", "TA_ID")):
+            rows = inputs[name][inputs[name]["course_code"] == course]
+            if len(rows):
+                row = rows.iloc[0]
+                shape = (row[person], tuple(parse_days(row["Days"])), row["credit_hours"], row["meeting_time"])
+            inputs[name] = inputs[name][inputs[name]["course_code"] != course].reset_index(drop=True)
+        self._clear(("once", course))
+        dormant = self._dormant.setdefault(course, {})
+        parked = set().union(*dormant.values())
+        live = [lit for lit in self.registry.course_literals(course) if lit.Index() not in parked]
+        if shape is not None and live:
+            self._record(("removed", course, shape), self._forbid, live)
+            dormant[shape] = {lit.Index() for lit in live}
+        self.assignment.pop(course, None)
+        self._dirty.discard(course)
+
+    def change_instructor(self, course, person):
+        inputs = self.schedule.inputs
+        fall = inputs["fall_courses"]
+        intro = inputs["intro_courses"]
+        if (fall["course_code"] == course).any():
+            row = fall[fall["course_code"] == course].iloc[0]
+            args = (row["Days"], row["credit_hours"], row["meeting_time"], False)
+        else:
+            row = intro[intro["course_code"] == course].iloc[0]
+            args = (row["Days"], row["credit_hours"], row["meeting_time"], True)
+        max_students = row.get("MaxStudents", 0)
+        self.remove_course(course)
+        self.add_course(course, person, *args, max_students=0 if pd.isna(max_students) else int(max_students))
+
+    def block_slot(self, slot_id, course=None):
+        indexes, blocked = [], set()
+        for idx in self.registry.by_slot(slot_id):
+            if course is None or self.registry.course_of(idx) == course:
+                var = self.registry.var(idx)
+                if var.Index() not in blocked:  # the meeting days of a slot share one literal
+                    blocked.add(var.Index())
+                    indexes.append(self.model.Add(var == 0).Index())
+                self._dirty.add(self.registry.course_of(idx))
+        self._blocks.setdefault((slot_id, course), []).extend(indexes)
+
+    def unblock_slot(self, slot_id, course=None):
+        for index in self._blocks.pop((slot_id, course), []):
+            clear_constraint(self.model, index)
+
+    def change_preference(self, person, preferred_time=None, breaks_between_session=None):
+        prefs = self.schedule.inputs["faculty_preferences"]
+        mask = prefs["instructor_name"] == person
+        if not mask.any():
+            prefs.loc[len(prefs), "instructor_name"] = person
+            mask = prefs["instructor_name"] == person
+        if preferred_time is not None:
+            prefs.loc[mask, "preferred_time"] = preferred_time
+        if breaks_between_session is not None:
+            prefs.loc[mask, "breaks_between_session"] = breaks_between_session
+        self._rebuild(("preferences", person))
+        self._rebuild(("breaks", person))
+        self._dirty.update(self.registry.course_of(idx) for idx in self.registry.by_person(person))
+
+    # Re-solve.  mode="fix" keeps every course untouched by the deltas at its previous slot
+    # (through assumptions, so nothing is permanently fixed) and falls back to hints when that
+    # is infeasible; mode="hint" only hints the previous assignment.
+    def solve(self, mode="fix"):
+        started = time.perf_counter()
+        self._set_objective()
+        self.model.ClearHints()
+        self.model.ClearAssumptions()
+        for course, lit in self.assignment.items():
+            if course not in self._dirty:
+                self.model.AddHint(lit, 1)
+                if mode == "fix":
+                    self.model.AddAssumption(lit)
+
+        solver, status = solve(self.model, self.config)
+        if status == cp_model.INFEASIBLE and mode == "fix" and self.assignment:
+            self.model.ClearAssumptions()
+            solver, status = solve(self.model, self.config)
+
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            self.assignment = {}
+            for course in self.registry.courses.names():
+                for lit in self.registry.course_literals(course):
+                    if solver.Value(lit):
+                        self.assignment[course] = lit
+            self._dirty = set()
+        self.last_solve_seconds = time.perf_counter() - started
+        return solver, status
+
+    def rows(self, solver):
+        return self.schedule.rows(solver)
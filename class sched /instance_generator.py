@@ -0,0 +1,214 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from data_loader import DATA_DIR, INPUT_FILES, OPTIONAL_FILES
+from time_model import SlotTimes, TIME_BLOCKS, to_minutes, minutes_to_str
+from domain_pruning import EXTERNAL_BUFFER
+
+# Synthetic departments with the same CSV schemas as Data/.  Sizes default to the sample data;
+# `scale` multiplies all of them.  Course credit hours / meeting patterns are drawn from the
+# combinations present in the slot template, so every generated course has candidate slots.
+# With rooms > 0 a rooms.csv and MaxStudents enrollments are generated as well.
+SAMPLE_SIZES = {"courses": 11, "sections": 29, "instructors": 6, "tas": 10, "programs": 9, "external": 11}
+
+DAY_PATTERNS = {
+    1: ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
+    2: ["Monday,Wednesday", "Tuesday,Thursday"],
+    3: ["Monday,Wednesday,Friday"],
+    4: ["Monday,Tuesday,Thursday,Friday"],
+}
+PREFERRED_TIMES = ["Morning", "Afternoon", "Evening", "Any"]
+BREAKS = [-1, 0, 60]
+ROOM_CAPACITIES = [24, 30, 40, 48, 60, 80, 120, 180]
+ENROLLMENTS = [15, 25, 35, 45, 60, 90, 150]
+ENROLLMENT_WEIGHTS = [0.15, 0.25, 0.25, 0.15, 0.1, 0.07, 0.03]
+DAY_START, DAY_END = to_minutes("8:00"), to_minutes("19:50")
+
+
+def _quoted_list(items):
+    return "[" + ", ".join(f'"{item}"' for item in items) + "]" if len(items) else ""
+
+
+# Slot template: the sample timeslot.csv, or with slot_step a regular grid of start times for
+# every (meeting_time, credit hours, duration) combination of the sample
+def generate_timeslots(template, slot_step=None):
+    if not slot_step:
+        return template.copy()
+    rows = []
+    combos = template[["meeting_time", "Credit_hours", "Duration"]].drop_duplicates()
+    for combo in combos.itertuples(index=False):
+        length = to_minutes(combo.Duration)
+        for start in range(DAY_START, DAY_END - length + 1, slot_step):
+            rows.append({"TimeSlotID": f"T{len(rows) + 1}", "start_time": minutes_to_str(start),
+                         "end_time": minutes_to_str(start + length), "Duration": combo.Duration,
+                         "meeting_time": combo.meeting_time, "Credit_hours": combo.Credit_hours})
+    return pd.DataFrame(rows)
+
+
+def generate_instance(courses=None, sections=None, instructors=None, tas=None, programs=None, external=None,
+                      scale=1.0, slot_step=None, seed=0, template_dir=DATA_DIR, rooms=0):
+    sizes = {name: max(1, int(round(value * scale))) for name, value in SAMPLE_SIZES.items()}
+    for name, value in (("courses", courses), ("sections", sections), ("instructors", instructors), ("tas", tas),
+                        ("programs", programs), ("external", external)):
+        if value is not None:
+            sizes[name] = value
+    rng = np.random.default_rng(seed)
+
+    timeslot = generate_timeslots(pd.read_csv(os.path.join(template_dir, INPUT_FILES["timeslot"])), slot_step)
+    combos = timeslot.groupby(["Credit_hours", "meeting_time"]).size().reset_index()[["Credit_hours", "meeting_time"]]
+    combos = combos[combos["meeting_time"].isin(DAY_PATTERNS)].to_numpy()
+    # Most real courses are 3-credit, twice a week; keep that the common case
+    weights = np.array([4.0 if (c, m) == (3, 2) else 1.0 for c, m in combos])
+    weights /= weights.sum()
+
+    def course_shape():
+        credit_hours, meeting_time = combos[rng.choice(len(combos), p=weights)]
+        days = DAY_PATTERNS[meeting_time][rng.integers(len(DAY_PATTERNS[meeting_time]))]
+        return int(credit_hours), int(meeting_time), days
+
+    fall_rows = []
+    codes = rng.choice(np.arange(3000, 7000), size=sizes["courses"], replace=False)
+    for i, code in enumerate(codes):
+        credit_hours, meeting_time, days = course_shape()
+        f = i % sizes["instructors"] + 1
+        fall_rows.append({"course_code": f"STAT {code}", "credit_hours": credit_hours, "Days": days,
+                          "Contact_minutes": credit_hours * 50, "instructor_id": f"F{f}",
+                          "instructor_name": f"Instructor {f}", "meeting_time": meeting_time})
+    fall_courses = pd.DataFrame(fall_rows)
+
+    intro_rows = []
+    n_intro = max(1, sizes["sections"] // 8)
+    intro_codes = rng.choice(np.arange(1000, 3000), size=n_intro, replace=False)
+    intro_shapes = [course_shape() for _ in range(n_intro)]  # sections of a course share its shape
+    # TAs take consecutive blocks of sections, i.e. sections of different courses; i % tas would
+    # give a TA every section of one course whenever n_intro divides tas
+    per_ta = -(-sizes["sections"] // sizes["tas"])
+    for i in range(sizes["sections"]):
+        credit_hours, meeting_time, days = intro_shapes[i % n_intro]
+        intro_rows.append({"course_code": f"STAT {intro_codes[i % n_intro]} section {i // n_intro + 1}",
+                           "credit_hours": credit_hours, "Days": days, "contact_minutes": credit_hours * 50,
+                           "TA_ID": f"TA{i // per_ta + 1}", "meeting_time": meeting_time})
+    intro_courses = pd.DataFrame(intro_rows)
+
+    external_rows = []
+    for i in range(sizes["external"]):
+        start = int(rng.integers(DAY_START // 30, (DAY_END - 75) // 30)) * 30
+        length = int(rng.choice([50, 75, 105]))
+        days = DAY_PATTERNS[int(rng.choice([2, 2, 4]))]
+        external_rows.append({"external_courses": f"{rng.choice(['CS', 'MATH'])} {1000 + i * 10}",
+                              "Day": days[rng.integers(len(days))].replace(",", ", "),
+                              "Start_Time": minutes_to_str(start), "End_Time": minutes_to_str(start + length)})
+    external_courses = pd.DataFrame(external_rows)
+
+    all_courses = list(fall_courses["course_code"]) + list(intro_courses["course_code"])
+    program_rows = []
+    for i in range(sizes["programs"]):
+        picked = rng.choice(all_courses, size=min(len(all_courses), int(rng.integers(2, 9))), replace=False)
+        n_required = max(1, len(picked) // 2)
+        ext = rng.choice(external_courses["external_courses"], size=min(len(external_rows), int(rng.integers(0, 4))),
+                         replace=False)
+        program_rows.append({"Semester": "Fall", "program_id": f"p{i + 1}", "program_code": f"P{i + 1:03d}",
+                             "program_name": f"Program {i + 1}", "Required_courses": _quoted_list(picked[:n_required]),
+                             "Elective_courses": _quoted_list(picked[n_required:]),
+                             "External_courses": _quoted_list(ext)})
+    specialization = pd.DataFrame(program_rows)
+
+    # Time-of-day and day preferences are hard constraints, so only prefer a block in which every
+    # course of the instructor still has a candidate slot, and days on which all of them meet
+    slot_times = SlotTimes(timeslot)
+    open_blocks = {}
+    for (credit_hours, meeting_time), rows in timeslot.groupby(["Credit_hours", "meeting_time"]).groups.items():
+        slots = [slot_times.index[str(v)] for v in timeslot.loc[rows, "TimeSlotID"]]
+        open_blocks[(credit_hours, meeting_time)] = {
+            block for block, window in TIME_BLOCKS.items() if slot_times.overlaps_window(*window)[slots].any()}
+
+    pref_rows = []
+    for f in range(1, sizes["instructors"] + 1):
+        own = fall_courses[fall_courses["instructor_id"] == f"F{f}"]
+        taught = list(own["course_code"])
+        preferred_time = rng.choice(PREFERRED_TIMES, p=[0.2, 0.2, 0.1, 0.5])
+        preferred_days = rng.choice(["N/A"] + DAY_PATTERNS[2])
+        for row in own.itertuples(index=False):
+            if preferred_time.lower() not in open_blocks[(row.credit_hours, row.meeting_time)]:
+                preferred_time = "Any"
+            if not set(row.Days.split(",")) <= set(preferred_days.split(",")):
+                preferred_days = "N/A"
+        pref_rows.append({"instructor_id": f"F{f}", "instructor_name": f"Instructor {f}",
+                          "preferred_time": preferred_time,
+                          "Course_taught": _quoted_list(taught),
+                          "preferred_days": preferred_days.replace(",", ", "),
+                          "breaks_between_session": int(rng.choice(BREAKS))})
+    faculty_preferences = pd.DataFrame(pref_rows)
+
+    # External clashes are hard as well: a program keeps an external course only while each of
+    # its required courses still has a candidate slot in its instructor's block that clashes
+    # with none of the external courses of its programs
+    open_slots = {}
+    windows = {row["instructor_name"]: TIME_BLOCKS.get(row["preferred_time"].lower()) for row in pref_rows}
+    for df, person in ((fall_courses, "instructor_name"), (intro_courses, "TA_ID")):
+        for row in df.to_dict("records"):
+            mask = ((timeslot["Credit_hours"] == row["credit_hours"])
+                    & (timeslot["meeting_time"] == row["meeting_time"])).to_numpy()
+            if windows.get(row[person]) is not None:
+                mask = mask & slot_times.overlaps_window(*windows[row[person]])
+            open_slots[row["course_code"]] = (mask, row["Days"].split(","))
+    external_times = {row["external_courses"]: (row["Day"].split(", "), to_minutes(row["Start_Time"]),
+                                                to_minutes(row["End_Time"])) for row in external_rows}
+    free = {course: mask for course, (mask, _) in open_slots.items()}
+    for i, program in enumerate(program_rows):
+        required = [c.strip('"') for c in program["Required_courses"].strip("[]").split(", ") if c]
+        kept = []
+        for ext in [c.strip('"') for c in program["External_courses"].strip("[]").split(", ") if c]:
+            ext_days, start, end = external_times[ext]
+            clash = slot_times.overlaps_window(start, end, buffer=EXTERNAL_BUFFER)
+            left = {course: free[course] & ~clash if set(ext_days) & set(open_slots[course][1]) else free[course]
+                    for course in required}
+            if all(mask.any() for mask in left.values()):
+                free.update(left)
+                kept.append(ext)
+        specialization.loc[i, "External_courses"] = _quoted_list(kept)
+
+    tables = {
+        "fall_courses": fall_courses,
+        "intro_courses": intro_courses,
+        "timeslot": timeslot,
+        "specialization": specialization,
+        "external_courses": external_courses,
+        "faculty_preferences": faculty_preferences,
+    }
+    if rooms:
+        capacity = rng.choice(ROOM_CAPACITIES, size=rooms)
+        capacity[0] = max(ROOM_CAPACITIES)  # every enrollment fits at least one room
+        tables["rooms"] = pd.DataFrame({"RoomNumber": [f"R{101 + i}" for i in range(rooms)], "SeatingCapacity": capacity})
+        fall_courses["MaxStudents"] = rng.choice(ENROLLMENTS, size=len(fall_courses), p=ENROLLMENT_WEIGHTS)
+        intro_courses["MaxStudents"] = rng.integers(20, 41, size=len(intro_courses))
+    return tables
+
+
+def write_instance(tables, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, df in tables.items():
+        df.to_csv(os.path.join(out_dir, dict(INPUT_FILES, **OPTIONAL_FILES)[name]), index=False)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic scheduling instance with the Data/ schemas")
+    parser.add_argument("out_dir")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier on the sample data sizes")
+    for name in SAMPLE_SIZES:
+        parser.add_argument(f"--{name}", type=int, help=f"number of {name} (default: {SAMPLE_SIZES[name]} x scale)")
+    parser.add_argument("--slot-step", type=int, help="generate a slot grid with this many minutes between starts")
+    parser.add_argument("--rooms", type=int, default=0, help="number of rooms (default: no rooms.csv)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    tables = generate_instance(scale=args.scale, slot_step=args.slot_step, seed=args.seed, rooms=args.rooms,
+                               **{name: getattr(args, name) for name in SAMPLE_SIZES})
+    write_instance(tables, args.out_dir)
+    print(f"Instance with {len(tables['fall_courses'])} courses, {len(tables['intro_courses'])} sections and "
+          f"{len(tables['timeslot'])} slots written to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from collections import defaultdict
+from ortools.sat.python import cp_model
+from variable_registry import VariableRegistry
+from time_model import SlotTimes, TIME_BLOCKS, load_external_times
+from final import days_of_week, parse_days, schedule_rows, BooleanScheduleModel
+from build_report import BuildReport
+from soft_constraints import weighted_penalties
+from constraint_emitter import Emitter
+from domain_pruning import CourseDomains
+from room_assignment import RoomTable, capacity_classes, add_room_cumulatives
+
+
+class IntervalScheduleModel:
+    # Interval formulation: each course meeting is an interval over the day whose start/end
+    # are tied to one slot-choice literal per (course, slot).  Instructor/TA and required-course
+    # conflicts become one AddNoOverlap per resource-day instead of enumerated overlap pairs,
+    # so the model grows with the number of courses rather than with slot pairs.
+    # The soft penalty families are the Boolean formulation's: the slot literals are registered
+    # per meeting day like its pattern literals, so elective overlap and break penalties are
+    # reified on pairs of them by the same builders and both formulations minimize the same
+    # objective.  prune / hard_externals / rooms as there.
+    def __init__(self, inputs, anonymous=False, prune=True, hard_externals=True):
+        self.inputs = inputs
+        self.model = cp_model.CpModel()
+        self.emit = Emitter(self.model, anonymous)
+        self.slot_times = SlotTimes(inputs["timeslot"])
+        self.hard_externals = hard_externals
+        self.domains = CourseDomains(inputs, self.slot_times, hard_externals) if prune else None
+        self.registry = VariableRegistry(self.model, slot_ids=self.slot_times.ids)
+        self.penalties = {}
+        self.conjunctions = []  # (penalty, a, b) as in BooleanScheduleModel
+        self.intervals = {}
+        self.slot_literals = {}
+        self._course_days = {}
+        self.rooms = RoomTable(inputs["rooms"]) if "rooms" in inputs else None
+        self.report = BuildReport()
+
+    # Same course rows and slot matching as the Boolean formulation, and the same registry-based
+    # penalty builders
+    course_rows = BooleanScheduleModel.course_rows
+    candidate_slots = BooleanScheduleModel.candidate_slots
+    programs = BooleanScheduleModel.programs
+    add_elective_penalties = BooleanScheduleModel.add_elective_penalties
+    add_break_penalties = BooleanScheduleModel.add_break_penalties
+
+    def build(self):
+        with self.report.family("course_intervals", self.model):
+            self.add_course_intervals()
+        with self.report.family("person_no_overlap", self.model):
+            self.add_person_no_overlap()
+        with self.report.family("required_no_overlap", self.model):
+            self.add_required_no_overlap()
+        if self.rooms is not None:
+            with self.report.family("room_capacity", self.model):
+                self.add_room_capacity()
+        with self.report.family("elective_overlap", self.model):
+            self.penalties["elective_overlap"] = self.add_elective_penalties()
+        with self.report.family("external", self.model):
+            self.penalties["external"] = self.add_external_penalties()
+        with self.report.family("time_preferences", self.model):
+            self.add_time_preferences()
+        with self.report.family("breaks", self.model):
+            self.penalties["breaks"] = self.add_break_penalties()
+        with self.report.family("objective", self.model):
+            self.set_objective()
+        if self.domains is not None:
+            self.report.meta["domains"] = self.domains.summary()
+        return self
+
+    def set_objective(self, weights=None):
+        self.model.Minimize(weighted_penalties(self.penalties, weights))
+
+    def add_course_intervals(self):
+        model, slot_times = self.model, self.slot_times
+        for course, person, row in self.course_rows():
+            days = parse_days(row.Days)
+            literals = {}
+            for ts_row in self.candidate_slots(row).itertuples(index=False):
+                lit = model.NewBoolVar(self.emit.name(f"{course}_{ts_row.TimeSlotID}"))
+                literals[slot_times.index[ts_row.TimeSlotID]] = lit
+                for day in days:
+                    self.registry.add(course, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, person, var=lit)
+            self.emit.exactly_one(literals.values())
+
+            starts = [int(slot_times.start[s]) for s in literals] or [0]
+            ends = [int(slot_times.end[s]) for s in literals] or [0]
+            durations = [e - s for s, e in zip(starts, ends)]
+            start = model.NewIntVarFromDomain(cp_model.Domain.FromValues(starts), self.emit.name(f"start_{course}"))
+            end = model.NewIntVarFromDomain(cp_model.Domain.FromValues(ends), self.emit.name(f"end_{course}"))
+            size = model.NewIntVar(min(durations), max(durations), self.emit.name(f"size_{course}"))
+            for s, lit in literals.items():
+                model.Add(start == int(slot_times.start[s])).OnlyEnforceIf(lit)
+                model.Add(end == int(slot_times.end[s])).OnlyEnforceIf(lit)
+
+            # Same slot on every meeting day, so one interval serves all of them
+            self.intervals[course] = model.NewIntervalVar(start, size, end, self.emit.name(f"meeting_{course}"))
+            self.slot_literals[course] = literals
+            self._course_days[course] = (person, days)
+
+    # Instructor/TA conflict avoidance
+    def add_person_no_overlap(self):
+        per_person_day = defaultdict(list)
+        for course, (person, days) in self._course_days.items():
+            for day in days:
+                per_person_day[(person, day)].append(self.intervals[course])
+        for intervals in per_person_day.values():
+            if len(intervals) > 1:
+                self.model.AddNoOverlap(intervals)
+
+    # No overlaps in specialization required courses
+    def add_required_no_overlap(self):
+        for required in self.inputs["specialization"]["required_courses"]:
+            courses = [c for c in set(required) if c in self.intervals]
+            for day in days_of_week:
+                intervals = [self.intervals[c] for c in courses if day in self._course_days[c][1]]
+                if len(intervals) > 1:
+                    self.model.AddNoOverlap(intervals)
+
+    # No more courses at once than rooms that seat them: one AddCumulative per day and capacity class
+    def add_room_capacity(self):
+        classes = capacity_classes(self.rooms, self.inputs, self.intervals)
+        add_room_cumulatives(self.model, self.intervals,
+                             {course: days for course, (_, days) in self._course_days.items()}, self.rooms, classes)
+
+    # External course conflict: forbidden, or without hard_externals one penalty per clashing
+    # slot and meeting day
+    def add_external_penalties(self):
+        external_dict = load_external_times(self.inputs["external_courses"])
+        clashes = []
+        for _, row in self.inputs["specialization"].iterrows():
+            for ext in row["external_courses"]:
+                for req in row["required_courses"]:
+                    if req not in self.slot_literals:
+                        continue
+                    for day in self._course_days[req][1]:
+                        if (ext, day) in external_dict:
+                            clash = self.slot_times.overlaps_window(*external_dict[(ext, day)], buffer=10)
+                            for s, lit in self.slot_literals[req].items():
+                                if clash[s]:
+                                    clashes.append(lit)
+        if self.hard_externals:
+            for lit in {lit.Index(): lit for lit in clashes}.values():
+                self.emit.forbid(lit)
+            return []
+        return clashes
+
+    # Faculty time preference and preferred days (hard)
+    def add_time_preferences(self):
+        for _, row in self.inputs["faculty_preferences"].iterrows():
+            pref = str(row["preferred_time"]).strip().lower()
+            in_window = self.slot_times.overlaps_window(*TIME_BLOCKS[pref]) if pref in TIME_BLOCKS else None
+            preferred_days = set(parse_days(row["preferred_days"])) if "preferred_days" in row.index else set()
+            for course, (person, days) in self._course_days.items():
+                if person != row["instructor_name"]:
+                    continue
+                off_days = bool(preferred_days) and not set(days) <= preferred_days
+                for s, lit in self.slot_literals[course].items():
+                    if off_days or (in_window is not None and not in_window[s]):
+                        self.emit.forbid(lit)
+
+    # Hint values for the start/end/size of each meeting interval and the penalty literals given
+    # the hinted slot literals
+    def auxiliary_hints(self, value_of):
+        hints = [(penalty, value_of(a) * value_of(b)) for penalty, a, b in self.conjunctions]
+        for course, literals in self.slot_literals.items():
+            chosen = [s for s, lit in literals.items() if value_of(lit)]
+            if not chosen:
+                continue
+            start, end = int(self.slot_times.start[chosen[0]]), int(self.slot_times.end[chosen[0]])
+            interval = self.intervals[course]
+            hints += [(interval.StartExpr(), start), (interval.EndExpr(), end), (interval.SizeExpr(), end - start)]
+        return hints
+
+    def rows(self, solver):
+        return schedule_rows(solver, self.registry)
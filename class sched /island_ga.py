@@ -0,0 +1,193 @@
+import os
+import time
+import argparse
+import multiprocessing
+from itertools import cycle, islice
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from generic_algorithm import load_data, number_of_elite_schedules, mutation_rate, tournament_selection_size
+from array_ga import GeneTables, ArrayGeneticAlgorithm
+from fitness_cache import FitnessCache
+
+# Island model: several independent array-GA populations evolve in worker processes for
+# `migration_interval` generations at a time (an epoch).  Between epochs the best `migrants`
+# schedules of every island replace the worst ones of the next island in the ring.  Each island
+# can have its own population size, mutation rate and tournament size.
+
+_TABLES = None  # GeneTables of the worker process: inherited through fork, else set by the initializer
+
+
+def _init_worker(tables):
+    global _TABLES
+    _TABLES = tables
+
+
+class IslandConfig:
+    def __init__(self, population_size=200, mutation_rate=mutation_rate, tournament_size=tournament_selection_size,
+                 elites=number_of_elite_schedules, cache_size=0):
+        self.population_size = population_size
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.elites = elites
+        self.cache_size = cache_size  # 0: no fitness cache
+
+    def __repr__(self):
+        return (f"IslandConfig(population_size={self.population_size}, mutation_rate={self.mutation_rate}, "
+                f"tournament_size={self.tournament_size})")
+
+
+# With fork the workers share the parent's tables (copy-on-write) instead of unpickling a copy
+def _worker_pool(jobs, tables):
+    global _TABLES
+    _TABLES = tables
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(tables,))
+
+
+# Runs one island for up to `generations` generations and returns its new state and statistics
+# (the island's fitness cache travels with its state, so it survives across epochs)
+def _run_epoch(config, population, conflicts, rng, cache, generations, tables=None):
+    if cache is None and config.cache_size:
+        cache = FitnessCache(config.cache_size)
+    algorithm = ArrayGeneticAlgorithm(tables or _TABLES, config.population_size, config.elites,
+                                      config.mutation_rate, config.tournament_size, cache=cache)
+    algorithm.rng = rng
+    started = time.perf_counter()
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    if population is None:
+        population = algorithm.initial_population()
+        conflicts = algorithm.evaluate(population)
+    ran = 0
+    while ran < generations and conflicts.min() > 0:
+        population, conflicts = algorithm.evolve(population, conflicts)
+        ran += 1
+    stats = {"generations": ran, "evaluations": algorithm.evaluations, "scored": algorithm.scored,
+             "seconds": time.perf_counter() - started, "best": int(conflicts.min()), "mean": float(conflicts.mean())}
+    if cache is not None:
+        stats.update(cache_hits=cache.hits - hits, cache_misses=cache.misses - misses)
+    return population, conflicts, algorithm.rng, cache, stats
+
+
+class IslandModel:
+    def __init__(self, tables, configs, migration_interval=10, migrants=1, jobs=None, seed=None):
+        self.tables = tables
+        self.configs = list(configs)
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.jobs = max(1, min(jobs or os.cpu_count() or 1, len(self.configs)))
+        self.rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(self.configs))]
+        self.populations = [None] * len(self.configs)
+        self.conflicts = [None] * len(self.configs)
+        self.caches = [None] * len(self.configs)
+        self.history = []  # one entry per epoch: {"epoch", "islands": [stats], "best", "mean", ...}
+
+    # Ring migration: copies of each island's best schedules replace the next island's worst
+    def migrate(self):
+        if self.migrants <= 0 or len(self.populations) < 2:
+            return
+        outgoing = []
+        for population, conflicts in zip(self.populations, self.conflicts):
+            best = np.argsort(conflicts, kind="stable")[:self.migrants]
+            outgoing.append((population[best].copy(), conflicts[best].copy()))
+        for i, (migrants, migrant_conflicts) in enumerate(outgoing):
+            target = (i + 1) % len(self.populations)
+            population, conflicts = self.populations[target], self.conflicts[target]
+            worst = np.argsort(conflicts, kind="stable")[::-1][:len(migrants)]
+            population[worst] = migrants[:len(worst)]
+            conflicts[worst] = migrant_conflicts[:len(worst)]
+
+    def _epoch(self, pool, generations):
+        args = [(config, population, conflicts, rng, cache, generations)
+                for config, population, conflicts, rng, cache
+                in zip(self.configs, self.populations, self.conflicts, self.rngs, self.caches)]
+        if pool is None:
+            results = [_run_epoch(*a, tables=self.tables) for a in args]
+        else:
+            results = list(pool.map(_run_epoch, *zip(*args)))
+        self.populations = [r[0] for r in results]
+        self.conflicts = [r[1] for r in results]
+        self.rngs = [r[2] for r in results]
+        self.caches = [r[3] for r in results]
+        return [r[4] for r in results]
+
+    def best(self):
+        island = int(np.argmin([c.min() for c in self.conflicts]))
+        index = int(np.argmin(self.conflicts[island]))
+        return self.populations[island][index], int(self.conflicts[island][index]), island
+
+    def run(self, generations, time_limit=None, callback=None):
+        started = time.perf_counter()
+        pool = _worker_pool(self.jobs, self.tables) if self.jobs > 1 else None
+        try:
+            done = 0
+            while done < generations:
+                epoch = min(self.migration_interval, generations - done)
+                stats = self._epoch(pool, epoch)
+                done += epoch
+                entry = {
+                    "epoch": len(self.history) + 1,
+                    "generations": done,
+                    "seconds": time.perf_counter() - started,
+                    "best": min(s["best"] for s in stats),
+                    "mean": float(np.mean(np.concatenate(self.conflicts))),
+                    "evaluations": sum(s["evaluations"] for s in stats),
+                    "islands": stats,
+                }
+                self.history.append(entry)
+                if callback:
+                    callback(entry)
+                if entry["best"] == 0 or (time_limit and entry["seconds"] >= time_limit):
+                    break
+                self.migrate()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.best()
+
+
+def print_epoch(entry):
+    islands = " ".join(f"{s['best']}/{s['mean']:.1f}" for s in entry["islands"])
+    print(f"epoch {entry['epoch']:3d} gen {entry['generations']:5d} {entry['seconds']:7.2f}s "
+          f"best {entry['best']:3d} mean {entry['mean']:7.2f} {entry['evaluations'] / 1000:7.1f}k evals  "
+          f"islands best/mean: {islands}")
+    if "cache_hits" in entry["islands"][0]:
+        hits = sum(s["cache_hits"] for s in entry["islands"])
+        misses = sum(s["cache_misses"] for s in entry["islands"])
+        print(f"          fitness cache: {hits} hits, {misses} misses")
+
+
+def island_configs(islands, population_sizes, mutation_rates, tournament_sizes, cache_size=0):
+    # Per-island values; shorter lists are cycled, e.g. --mutation-rates 0.02 0.1
+    return [IslandConfig(p, m, t, cache_size=cache_size) for p, m, t in islice(zip(cycle(population_sizes), cycle(mutation_rates),
+                                                            cycle(tournament_sizes)), islands)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Island-model genetic algorithm across a process pool")
+    parser.add_argument("--islands", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--population-sizes", type=int, nargs="+", default=[200])
+    parser.add_argument("--mutation-rates", type=float, nargs="+", default=[mutation_rate])
+    parser.add_argument("--tournament-sizes", type=int, nargs="+", default=[tournament_selection_size])
+    parser.add_argument("--cache-size", type=int, default=0, help="per-island fitness cache entries (LRU)")
+    parser.add_argument("--generations", type=int, default=500)
+    parser.add_argument("--migration-interval", type=int, default=10, help="generations between migrations")
+    parser.add_argument("--migrants", type=int, default=1, help="schedules sent to the next island per migration")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: all cores, at most one per island)")
+    parser.add_argument("--time-limit", type=float, help="stop after the first epoch past this many seconds")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    tables = GeneTables(load_data())
+    configs = island_configs(args.islands, args.population_sizes, args.mutation_rates, args.tournament_sizes,
+                             args.cache_size)
+    model = IslandModel(tables, configs, args.migration_interval, args.migrants, args.jobs, args.seed)
+    genes, conflicts, island = model.run(args.generations, args.time_limit, print_epoch)
+    print(f"best schedule: {conflicts} conflicts (island {island + 1})")
+    for dept, course, meetingTime, room, instructor in tables.describe(genes):
+        print(f"{dept.get_name()} {course.get_courseNumber()} {room.get_number()} ({room.get_seatingCapacity()}) "
+              f"{instructor.get_id()} {meetingTime.get_id()} ({meetingTime.get_time()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
 import pandas as pd
 from ortools.sat.python import cp_model
-
-
-fall_courses = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/fallcourses.csv")
-intro_courses = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/intro copy.csv")
-timeslot = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/timeslot.csv")
+from solver_config import solve
+from variable_registry import VariableRegistry
+from time_model import SlotTimes
+from conflict_constraints import add_conflict_cliques
+from collections import defaultdict
+from data_loader import load_inputs, parse_days
+
+
+inputs = load_inputs(files={"faculty_preferences": "fall preferences.csv"})
+fall_courses = inputs["fall_courses"]
+intro_courses = inputs["intro_courses"]
+timeslot = inputs["timeslot"]
 fall_courses.head()
 intro_courses.head()
 timeslot.head()
+slot_times = SlotTimes(timeslot)
 
 model = cp_model.CpModel()
-days_of_week = ["Monday", "Tuesday", "wednesday", "Thursday", "Friday"]
-schedule_vars = {}
+registry = VariableRegistry(model, slot_ids=slot_times.ids)
 
 # Decision variable for Introductory Courses and fall courses 
 ta_courses = intro_courses[intro_courses["TA_ID"].str.startswith("TA")]
@@ -23,9 +30,9 @@ for row in ta_courses.itertuples(index=False):
 
     for ts_row in timeslot.itertuples(index=False):
         if ts_row.Credit_hours == credit_hours and ts_row.meeting_time == meeting_time:
-            for day in [day.strip().capitalize() for day in row.Days.split(",")]:
-                key = (course, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, assigned_ta)
-                schedule_vars[key] = model.NewBoolVar(f"{course}_{ts_row.TimeSlotID}_{ts_row.start_time}_{ts_row.end_time}_{day}_{assigned_ta}")
+            for day in parse_days(row.Days):
+                registry.add(course, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, assigned_ta,
+                             name=f"{course}_{ts_row.TimeSlotID}_{ts_row.start_time}_{ts_row.end_time}_{day}_{assigned_ta}")
         
 for row in fall_courses.itertuples(index=False):
     course = row.course_code
@@ -35,71 +42,51 @@ for row in fall_courses.itertuples(index=False):
 
     for ts_row in timeslot.itertuples(index=False):
         if ts_row.Credit_hours == credit_hours and ts_row.meeting_time == meeting_time:
-            for day in [day.strip().capitalize() for day in row.Days.split(",")]:
-                key = (course, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, assigned_instructor)
-                schedule_vars[key] = model.NewBoolVar(f"{course}_{ts_row.TimeSlotID}_{ts_row.start_time}_{ts_row.end_time}_{day}_{assigned_instructor}")
+            for day in parse_days(row.Days):
+                registry.add(course, ts_row.TimeSlotID, ts_row.start_time, ts_row.end_time, day, assigned_instructor,
+                             name=f"{course}_{ts_row.TimeSlotID}_{ts_row.start_time}_{ts_row.end_time}_{day}_{assigned_instructor}")
 
-print("Existing schedule_vars keys:", list(schedule_vars.keys()))
-print(f"Total decision variables created: {len(schedule_vars)}")
+print(f"Total decision variables created: {len(registry)}")
 
-for key, var in schedule_vars.items():
+for key, var in registry.items():
     print(f"{key}: {var}")
 
 # Constraints: Ensure an instructor/TA is assigned to only one course per time slot
 
-unique_instructors = set(key[5] for key in schedule_vars.keys())
-days_of_week = set(key[4] for key in schedule_vars.keys())
+unique_instructors = registry.persons.names()
+days_of_week = registry.days.names()
 
 for instructor in unique_instructors:
     for day in days_of_week:       
-        instructor_schedule = {key: value for key, value in schedule_vars.items() if key[5] == instructor and key[4] == day}               
-        unique_time_slots = { (key[1], key[2], key[3]) for key in instructor_schedule.keys() }
+        slot_groups = defaultdict(list)
+        for idx in registry.by_person_day(instructor, day):
+            slot_groups[registry.slot_of(idx)].append(idx)
 
-        for ts_id, start_time, end_time in unique_time_slots:
-            assigned_courses = [
-                key for key in instructor_schedule.keys()
-                if key[1] == ts_id and key[2] == start_time and key[3] == end_time
-            ]
-            if assigned_courses:
-                model.Add(sum(schedule_vars[key] for key in assigned_courses) <= 1)
+        for assigned_courses in slot_groups.values():
+            model.Add(sum(registry.vars(assigned_courses)) <= 1)
 
 
 #ensures that courses are not scheduled at the same time.checks for the duration of the courses-time overlaps in course durarion 
 for instructor in unique_instructors:
     for day in days_of_week:
-        instructor_schedule = [
-            key for key in schedule_vars.keys() if key[5] == instructor and key[4] == day
-        ]
-        
-        for i in range(len(instructor_schedule)):
-            for j in range(i + 1, len(instructor_schedule)): 
-                key1 = instructor_schedule[i]
-                key2 = instructor_schedule[j]
-                
-                course1, ts_id1, start1, end1, day1, instructor1 = key1
-                course2, ts_id2, start2, end2, day2, instructor2 = key2
-                if start1 < end2 and start2 < end1:  # Overlapping condition
-                    model.Add(schedule_vars[key1] + schedule_vars[key2] <= 1)
+        add_conflict_cliques(model, registry, slot_times, registry.by_person_day(instructor, day))
 
 
 
 # Constraint: Courses should be scheduled only once per day
-unique_courses = set(key[0] for key in schedule_vars.keys())
-days_of_week = set(key[4] for key in schedule_vars.keys())
+unique_courses = registry.courses.names()
+days_of_week = registry.days.names()
 for course in unique_courses:
     for day in days_of_week:
-        course_schedule = [
-            key for key in schedule_vars.keys()
-            if key[0] == course and key[4] == day
-        ]
+        course_schedule = registry.by_course_day(course, day)
         if course_schedule:
-            model.Add(sum(schedule_vars[key] for key in course_schedule) == 1)
+            model.Add(sum(registry.vars(course_schedule)) == 1)
 
 
 
 
 # Faculty preferences
-faculty_preferences = pd.read_csv("/Users/justiineazigi/Documents/Class-Scheduler/Data/fall preferences.csv")
+faculty_preferences = inputs["faculty_preferences"]
 faculty_preferences.head
 faculty_prefs_dict = faculty_preferences.set_index("instructor_name")[["preferred_time", "breaks_between_session"]].to_dict("index")
 
@@ -127,9 +114,7 @@ for instructor, prefs in faculty_prefs_dict.items():
         time_range = None  
 
     for day in days_of_week:
-        instructor_schedule = [
-            key for key in schedule_vars.keys() if key[5] == instructor and key[4] == day
-        ]
+        instructor_schedule = [registry.key(idx) for idx in registry.by_person_day(instructor, day)]
 
         # Apply preferred teaching time constraint
         if time_range:
@@ -161,8 +146,7 @@ for instructor, prefs in faculty_prefs_dict.items():
 
 
 
-solver = cp_model.CpSolver()
-status = solver.Solve(model)
+solver, status = solve(model)
 
 if status == cp_model.FEASIBLE or status == cp_model.OPTIMAL:
     print("Solution Found!")
@@ -173,7 +157,7 @@ else:
 
 if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
     print("\nFinal Schedule:\n" + "-" * 50)
-    for key, var in schedule_vars.items():
+    for key, var in registry.items():
         if solver.Value(var) == 1:  # If the course is scheduled
             course, ts_id, start_time, end_time, day, instructor = key
             print(f"Course: {course} | Start Time: {start_time} | End Time: {end_time} | Day: {day} | Assigned to: {instructor}")
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import shutil
+import pickle
+import hashlib
+from ortools.sat.python import cp_model
+from data_loader import DATA_DIR, INPUT_FILES, OPTIONAL_FILES, CACHE_DIR
+from variable_registry import VariableRegistry
+
+# Built models are cached by a hash of the input CSVs, the model-building code and the
+# constraint configuration.  Each entry holds the CpModelProto (text format) and a pickled side
+# table with every other attribute of the schedule object; variables inside it are stored as
+# proto indices and re-attached to the loaded model.
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+MODEL_SOURCES = ["data_loader.py", "final.py", "interval_model.py", "variable_registry.py", "time_model.py",
+                 "conflict_constraints.py", "constraint_emitter.py", "soft_constraints.py", "domain_pruning.py",
+                 "room_assignment.py", "build_report.py"]
+
+MODEL_FILE = "model.pb.txt"
+STATE_FILE = "state.pkl"
+
+
+def cache_key(data_dir, model_class, options=None):
+    digest = hashlib.sha256()
+    for name in sorted(INPUT_FILES.values()):
+        with open(os.path.join(data_dir, name), "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    for name in sorted(OPTIONAL_FILES.values()):
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_SOURCES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    digest.update(model_class.__name__.encode())
+    digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+# Side table encoding: model variables become ("var"/"not"/"interval", proto index)
+def _encode(value):
+    if isinstance(value, cp_model.IntervalVar):
+        return ("__interval__", value.Index())
+    if isinstance(value, cp_model.IntVar):
+        return ("__var__", value.Index())
+    if type(value).__name__ == "NotBooleanVariable":
+        return ("__not__", value.Not().Index())
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_encode(v) for v in value)
+    return value
+
+
+def _decode(value, model):
+    if isinstance(value, tuple) and len(value) == 2 and value[0] in ("__var__", "__not__", "__interval__"):
+        tag, index = value
+        if tag == "__interval__":
+            return model.GetIntervalVarFromProtoIndex(index)
+        var = model.GetIntVarFromProtoIndex(index)
+        return var.Not() if tag == "__not__" else var
+    if isinstance(value, dict):
+        return {k: _decode(v, model) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v, model) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_decode(v, model) for v in value)
+    return value
+
+
+def _load_proto(model, text):
+    proto = model.Proto()
+    if hasattr(proto, "parse_text_format"):
+        proto.parse_text_format(text)
+    else:
+        from google.protobuf import text_format
+        text_format.Merge(text, proto)
+
+
+def store(key, schedule, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    entry = os.path.join(cache_dir, key)
+    tmp = entry + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    schedule.model.ExportToFile(os.path.join(tmp, MODEL_FILE))
+
+    registry = schedule.registry
+    state = {name: _encode(value) for name, value in vars(schedule).items() if name not in ("model", "registry")}
+    state["registry"] = [(registry.key(idx), registry.var(idx).Index()) for idx in range(len(registry))]
+    with open(os.path.join(tmp, STATE_FILE), "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp, entry)
+    evict(cache_dir, max_bytes)
+
+
+def load(key, model_class, cache_dir=CACHE_DIR):
+    entry = os.path.join(cache_dir, key)
+    if not os.path.isdir(entry):
+        return None
+    model = cp_model.CpModel()
+    with open(os.path.join(entry, MODEL_FILE)) as f:
+        _load_proto(model, f.read())
+    with open(os.path.join(entry, STATE_FILE), "rb") as f:
+        state = pickle.load(f)
+
+    schedule = model_class.__new__(model_class)
+    schedule.model = model
+    for name, value in state.items():
+        if name != "registry":
+            setattr(schedule, name, _decode(value, model))
+    schedule.registry = VariableRegistry(model, slot_ids=schedule.slot_times.ids)
+    if getattr(schedule, "emit", None) is not None:
+        schedule.emit.model = model
+    if getattr(schedule, "report", None) is not None:
+        schedule.report.cached = True  # its build statistics are the original build's
+    for key_tuple, index in state["registry"]:
+        schedule.registry.add(*key_tuple, var=model.GetBoolVarFromProtoIndex(index))
+    os.utime(entry)  # least recently used entries are evicted first
+    return schedule
+
+
+def build_cached(inputs_loader, model_class, data_dir=DATA_DIR, options=None, cache_dir=CACHE_DIR):
+    # Returns (schedule, hit); inputs are only loaded when the model has to be built.
+    # options are passed to the model class and are part of the key.
+    key = cache_key(data_dir, model_class, options)
+    schedule = load(key, model_class, cache_dir)
+    if schedule is not None:
+        return schedule, True
+    schedule = model_class(inputs_loader(data_dir), **(options or {})).build()
+    store(key, schedule, cache_dir)
+    return schedule, False
+
+
+# (mtime, bytes, path) of every model entry and of the parsed-input pickles data_loader writes
+# into the same directory, least recently used first
+def _entries(cache_dir):
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isdir(path) and not name.endswith(".tmp"):
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        elif name.startswith("inputs-") and name.endswith(".pkl"):
+            size = os.path.getsize(path)
+        else:
+            continue
+        entries.append((os.path.getmtime(path), size, path))
+    return sorted(entries)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    entries = _entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+        total -= size
+
+
+# Also drops the parsed-input pickles written by data_loader
+def clear(cache_dir=CACHE_DIR):
+    count = sum(1 for _, _, path in _entries(cache_dir) if os.path.isdir(path))
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return count
+
+
+# python model_cache.py [info|clear]
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    if command == "clear":
+        print(f"Removed {clear()} cached models from {CACHE_DIR}")
+    elif command == "info":
+        entries = _entries(CACHE_DIR)
+        for mtime, size, path in entries:
+            print(f"{os.path.basename(path)[:29]:29}  {size / 1024:8.1f} KiB  last used {time.ctime(mtime)}")
+        models = sum(1 for _, _, path in entries if os.path.isdir(path))
+        print(f"{models} cached models, {len(entries) - models} parsed inputs, "
+              f"{sum(s for _, s, _ in entries) / 1024:.1f} KiB in {CACHE_DIR}")
+    else:
+        sys.exit(f"Unknown command: {command} (use info or clear)")
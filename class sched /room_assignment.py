@@ -0,0 +1,237 @@
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from ortools.sat.python import cp_model
+from data_loader import days_of_week
+from time_model import to_minutes
+from conflict_constraints import overlap_cliques
+from solver_config import SolverConfig, solve
+from soft_constraints import hint_solution, clear_constraint
+
+# Rooms as a decision dimension, assigned in two stages so the time model never holds one
+# literal per (course, slot, room).
+# Stage 1, inside the time model, only counts rooms.  Courses are grouped by capacity class:
+# class k holds the courses whose enrollment needs at least the k-th smallest distinct seating
+# capacity.  At any moment of a day the courses of class k or above may not outnumber the rooms
+# seating at least that capacity -- one constraint per overlap clique and class in use, however
+# many rooms there are.
+# Stage 2 fixes the chosen times and gives each course one room for all of its meeting days, in
+# the same grouping: first a capacity level per course (only levels that seat the enrollment are
+# candidates, at most as many courses of a level at once as it has rooms, wasted seats
+# minimized so large rooms stay free for large sections), then the rooms within each level,
+# which are interchangeable.  Stage 1 is necessary but not always sufficient (a course keeps its
+# room on every meeting day), so both steps place as many courses as they can; the few left
+# over try every fitting room that is still free, and the time model is re-solved without the
+# slots of those that still have none (solve_with_rooms).
+# Without rooms.csv neither stage runs; courses without a MaxStudents value fit any room.
+
+ROOM_ROUNDS = 5  # time re-solves that move courses stage 2 left without a room
+
+
+class RoomTable:
+    # rooms.csv sorted by seating capacity, so the rooms seating n students are a suffix
+    def __init__(self, rooms):
+        capacity = rooms["SeatingCapacity"].to_numpy(dtype=np.int64)
+        order = np.argsort(capacity, kind="stable")
+        self.numbers = [str(rooms["RoomNumber"].iloc[i]) for i in order]
+        self.capacity = capacity[order]
+        self.levels = np.unique(self.capacity)  # distinct capacities, ascending
+        # at_least[k]: rooms seating at least levels[k]
+        self.at_least = len(self.capacity) - np.searchsorted(self.capacity, self.levels, side="left")
+
+    def __len__(self):
+        return len(self.numbers)
+
+    # Smallest capacity level that seats `enrollment`; len(levels) when no room does
+    def capacity_class(self, enrollment):
+        return int(np.searchsorted(self.levels, enrollment, side="left"))
+
+    # First room that seats `enrollment`; rooms first..len-1 are the candidates
+    def first_fitting(self, enrollment):
+        return int(np.searchsorted(self.capacity, enrollment, side="left"))
+
+
+def course_enrollments(inputs):
+    enrollments = {}
+    for name in ("fall_courses", "intro_courses"):
+        df = inputs[name]
+        if "MaxStudents" not in df.columns:
+            continue
+        for course, students in zip(df["course_code"], df["MaxStudents"]):
+            if not pd.isna(students):
+                enrollments[course] = max(enrollments.get(course, 0), int(students))
+    return enrollments
+
+
+# Capacity class of every course some room seats.  Larger courses are left out of stage 1;
+# stage 2 reports them as unplaced.
+def capacity_classes(rooms, inputs, courses):
+    enrollments = course_enrollments(inputs)
+    classes = {}
+    for course in courses:
+        k = rooms.capacity_class(enrollments.get(course, 0))
+        if k < len(rooms.levels):
+            classes[course] = k
+    return classes
+
+
+# Stage 1 for the Boolean formulation: registry entries of one day, cut into overlap cliques
+def add_room_capacity(model, registry, slot_times, rooms, classes, days=None):
+    levels = sorted(set(classes.values()))
+    for day in days if days is not None else days_of_week:
+        entries = [i for course in classes for i in registry.by_course_day(course, day)]
+        slots = [registry.slot_index(i) for i in entries]
+        for clique in overlap_cliques(entries, slot_times.start[slots], slot_times.end[slots]):
+            for k in levels:
+                members = [i for i in clique if classes[registry.course_of(i)] >= k]
+                # each course has at most one chosen entry per day, so count courses
+                if len({registry.course_of(i) for i in members}) > rooms.at_least[k]:
+                    model.Add(sum(registry.vars(members)) <= int(rooms.at_least[k]))
+
+
+# Stage 1 for the interval formulation: one cumulative per day and class in use
+def add_room_cumulatives(model, intervals, course_days, rooms, classes):
+    levels = sorted(set(classes.values()))
+    for day in days_of_week:
+        meeting = [course for course in classes if day in course_days[course]]
+        for k in levels:
+            members = [intervals[course] for course in meeting if classes[course] >= k]
+            if len(members) > rooms.at_least[k]:
+                model.AddCumulative(members, [1] * len(members), int(rooms.at_least[k]))
+
+
+# Courses -> chosen option, for options[c] = {key: cost} and groups[key] = (limit, cliques): of
+# the courses in each clique at most `limit` take `key`.  Taking an option outweighs every
+# cost, so as many courses as possible get one.
+def _place(options, groups, config):
+    model = cp_model.CpModel()
+    take = [{key: model.NewBoolVar("") for key in course_options} for course_options in options]
+    for course_take in take:
+        model.AddAtMostOne(course_take.values())
+    for key, (limit, cliques) in groups.items():
+        for clique in cliques:
+            lits = [take[c][key] for c in clique if key in take[c]]
+            if len(lits) > limit:
+                model.Add(sum(lits) <= limit)
+    weight = sum(max(o.values(), default=0) for o in options) + 1
+    model.Minimize(sum(cost * take[c][key] for c, course_options in enumerate(options)
+                       for key, cost in course_options.items())
+                   - weight * sum(lit for course_take in take for lit in course_take.values()))
+    solver, status = solve(model, config)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return {}
+    return {c: key for c, course_take in enumerate(take) for key, lit in course_take.items() if solver.Value(lit)}
+
+
+# First room of `candidates` free at every (day, start, end) of `meeting`, booked for it; None if none is
+def _first_free(meeting, candidates, booked):
+    for r in candidates:
+        if all(end <= s or e <= start for day, (start, end) in meeting.items() for s, e in booked[(r, day)]):
+            _book(booked, r, meeting)
+            return r
+    return None
+
+
+def _book(booked, room, meeting, remove=False):
+    for day, times in meeting.items():
+        if remove:
+            booked[(room, day)].remove(times)
+        else:
+            booked[(room, day)].append(times)
+
+
+def _cliques(members, meetings, day):
+    times = [meetings[c][day] for c in members]
+    return overlap_cliques(members, [t[0] for t in times], [t[1] for t in times])
+
+
+# Stage 2: rows (final_schedule.csv rows of a solved schedule) -> (rows with a "Room", courses
+# without one)
+def assign_rooms(rows, inputs, config=None):
+    config = config or SolverConfig()
+    rooms = RoomTable(inputs["rooms"])
+    by_course = defaultdict(dict)  # course -> day -> (start, end) minutes
+    for row in rows:
+        by_course[row["Course"]][row["Day"]] = (to_minutes(row["Start Time"]), to_minutes(row["End Time"]))
+    courses = list(by_course)
+    meetings = [by_course[course] for course in courses]
+    enrollments = course_enrollments(inputs)
+    students = [enrollments.get(course, 0) for course in courses]
+    level_start = np.searchsorted(rooms.capacity, rooms.levels, side="left")
+    level_rooms = np.diff(np.append(level_start, len(rooms)))
+
+    # Capacity level of every course
+    options = [{level: int(rooms.levels[level]) - n for level in range(rooms.capacity_class(n), len(rooms.levels))}
+               for n in students]
+    groups = {}
+    for level in range(len(rooms.levels)):
+        eligible = [c for c in range(len(courses)) if level in options[c]]
+        groups[level] = (int(level_rooms[level]), [clique for day in days_of_week for clique in
+                                                   _cliques([c for c in eligible if day in meetings[c]], meetings, day)])
+    level_of = _place(options, groups, config)
+
+    # Rooms within each level: greedily by start time, and with CP-SAT when that leaves a course out
+    room_of = {}
+    booked = defaultdict(list)  # (room, day) -> [(start, end)]
+    for level in range(len(rooms.levels)):
+        members = sorted((c for c, l in level_of.items() if l == level), key=lambda c: min(meetings[c].values()))
+        level_range = range(level_start[level], level_start[level] + level_rooms[level])
+        greedy = {c: _first_free(meetings[c], level_range, booked) for c in members}
+        if None in greedy.values():
+            for c, r in greedy.items():
+                if r is not None:
+                    _book(booked, r, meetings[c], remove=True)
+            local = {c: i for i, c in enumerate(members)}
+            cliques = [[local[c] for c in clique] for day in days_of_week
+                       for clique in _cliques([c for c in members if day in meetings[c]], meetings, day)]
+            # the rooms are interchangeable: the i-th course only needs the first i + 1 of them
+            placed = _place([{r: 0 for r in level_range[:i + 1]} for i in range(len(members))],
+                            {r: (1, cliques) for r in level_range}, config)
+            greedy = {members[i]: r for i, r in placed.items()}
+            for c, r in greedy.items():
+                _book(booked, r, meetings[c])
+        room_of.update((c, r) for c, r in greedy.items() if r is not None)
+
+    # Leftovers, largest first: the smallest fitting room free at all of their meetings
+    for c in sorted(set(range(len(courses))) - set(room_of), key=lambda c: -students[c]):
+        r = _first_free(meetings[c], range(rooms.first_fitting(students[c]), len(rooms)), booked)
+        if r is not None:
+            room_of[c] = r
+
+    unplaced = [course for c, course in enumerate(courses) if c not in room_of]
+    numbers = {course: rooms.numbers[room_of[c]] for c, course in enumerate(courses) if c in room_of}
+    return [dict(row, Room=numbers.get(row["Course"], "")) for row in rows], unplaced
+
+
+# Both stages.  A course stage 2 leaves without a room may not keep its slot in the next time
+# solve (hinted with the previous solution); after `rounds` re-solves, or when the time model
+# runs out of options, the best rows so far are returned.  solve_times() -> (solver, status)
+# solves schedule.model.  The slot bans only hold for these re-solves: they are cleared before
+# returning, as the model may be reused (build_cached, IncrementalScheduler).  Returns (solver,
+# status, rows, unplaced courses).
+def solve_with_rooms(schedule, solve_times, config=None, rounds=ROOM_ROUNDS):
+    model, registry = schedule.model, schedule.registry
+    rooms, enrollments = RoomTable(schedule.inputs["rooms"]), course_enrollments(schedule.inputs)
+    best, bans = None, []
+    try:
+        for _ in range(rounds + 1):
+            solver, status = solve_times()
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                break
+            rows, unplaced = assign_rooms(schedule.rows(solver), schedule.inputs, config)
+            if best is None or len(unplaced) < len(best[3]):
+                best = (solver, status, rows, unplaced)
+            # another slot cannot help a course no room seats
+            movable = [c for c in unplaced if rooms.capacity_class(enrollments.get(c, 0)) < len(rooms.levels)]
+            if not movable:
+                break
+            hint_solution(model, solver.ResponseProto().solution)
+            for course in movable:
+                for lit in registry.course_literals(course):
+                    if solver.Value(lit):
+                        bans.append(model.Add(lit == 0).Index())
+    finally:
+        for index in bans:
+            clear_constraint(model, index)
+        model.ClearHints()
+    return best if best is not None else (solver, status, [], [])
@@ -0,0 +1,175 @@
+import argparse
+import tracemalloc
+import pandas as pd
+from ortools.sat.python import cp_model
+from final import DATA_DIR, SCHEDULE_COLUMNS, load_inputs, BooleanScheduleModel
+from interval_model import IntervalScheduleModel
+from solver_config import add_solver_arguments, config_from_args, solve
+from warm_start import add_schedule_hints
+from decomposition import solve_decomposed
+from model_cache import build_cached
+from build_report import logging_parameters
+from solution_stream import ScheduleStream, ProgressPrinter, stream_consumer
+from soft_constraints import parse_weights, parse_tiers, penalty_counts, solve_lexicographic
+from hybrid import solve_hybrid, describe_round
+from room_assignment import assign_rooms, solve_with_rooms
+
+FORMULATIONS = {
+    "boolean": BooleanScheduleModel,
+    "interval": IntervalScheduleModel,
+}
+
+
+def build_schedule(inputs, formulation="boolean", **options):
+    return FORMULATIONS[formulation](inputs, **options).build()
+
+
+def write_schedule(rows, path):
+    columns = SCHEDULE_COLUMNS + (["Room"] if rows and "Room" in rows[0] else [])
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+
+
+# Stage 2 of room_assignment once the times are fixed; rows come back unchanged without rooms.csv
+def place_rooms(rows, inputs, config):
+    if "rooms" not in inputs or not rows:
+        return rows
+    rows, unplaced = assign_rooms(rows, inputs, config)
+    print_rooms(inputs, unplaced)
+    return rows
+
+
+def print_rooms(inputs, unplaced):
+    print(f"Rooms assigned from {len(inputs['rooms'])} rooms"
+          + (f"; no room fits {len(unplaced)} course(s): {', '.join(unplaced)}" if unplaced else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and solve the class schedule")
+    parser.add_argument("--formulation", choices=sorted(FORMULATIONS), default="boolean")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output", default="final_schedule.csv")
+    parser.add_argument("--warm-start", metavar="CSV", help="hint the solver with a previous final_schedule.csv")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always rebuild the model instead of loading it from the cache")
+    parser.add_argument("--anonymous", action="store_true",
+                        help="leave model variables unnamed (smaller model; keys stay in the registry)")
+    parser.add_argument("--no-prune", action="store_true",
+                        help="create literals for every candidate slot instead of pruning hard-infeasible ones")
+    parser.add_argument("--soft-externals", action="store_true",
+                        help="penalize required/external course clashes instead of forbidding them")
+    parser.add_argument("--decompose", action="store_true",
+                        help="solve independent groups of courses separately and merge the results")
+    parser.add_argument("--jobs", type=int, help="processes used by --decompose (default: search workers)")
+    parser.add_argument("--weight", action="append", default=[], metavar="FAMILY=W",
+                        help="penalty weight of a soft-constraint family (external, elective_overlap, breaks)")
+    parser.add_argument("--lexicographic", action="store_true",
+                        help="optimize the soft-constraint families tier by tier instead of a weighted sum")
+    parser.add_argument("--tiers", type=parse_tiers, metavar="F1;F2,F3",
+                        help="priority tiers for --lexicographic (default: external;elective_overlap;breaks)")
+    parser.add_argument("--hybrid", action="store_true",
+                        help="alternate a genetic algorithm with CP-SAT, exchanging their best schedules")
+    parser.add_argument("--rounds", type=int, default=3, help="GA -> CP-SAT rounds of --hybrid")
+    parser.add_argument("--ga-seconds", type=float, default=5.0, help="GA budget per --hybrid round")
+    parser.add_argument("--stream", metavar="PATH",
+                        help="publish every improving schedule while solving (CSV, or JSON lines for *.jsonl)")
+    parser.add_argument("--progress", action="store_true", help="print every improving solution")
+    parser.add_argument("--report", metavar="JSON", help="write per-family build and solver statistics")
+    parser.add_argument("--report-table", action="store_true", help="print the build and solver statistics")
+    add_solver_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.decompose and (args.warm_start or args.lexicographic):
+        parser.error("--warm-start and --lexicographic cannot be combined with --decompose")
+    if args.hybrid and (args.decompose or args.warm_start or args.lexicographic or args.formulation != "boolean"):
+        parser.error("--hybrid needs the boolean formulation without --decompose, --warm-start or --lexicographic")
+    weights = parse_weights(args.weight)
+    options = {"anonymous": True} if args.anonymous else {}
+    if args.no_prune:
+        options["prune"] = False
+    if args.soft_externals:
+        options["hard_externals"] = False
+    solver_config = config_from_args(args)
+    reporting = args.report or args.report_table
+    if reporting:
+        tracemalloc.start()
+        solver_config.update(parameters=logging_parameters(solver_config.log_search_progress))
+
+    if args.decompose:
+        inputs = load_inputs(args.data_dir)
+        status, rows, components = solve_decomposed(inputs, FORMULATIONS[args.formulation],
+                                                    solver_config, args.jobs, weights, options)
+        print(f"Formulation: {args.formulation}, {len(components)} independent components "
+              f"(largest: {len(components[0]) if components else 0} courses)")
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            print("❌ No feasible solution found.")
+            return status
+        rows = place_rooms(rows, inputs, solver_config)
+        write_schedule(rows, args.output)
+        print(f"{len(rows)} assignments written to {args.output}")
+        return status
+
+    if args.no_cache:
+        schedule = build_schedule(load_inputs(args.data_dir), args.formulation, **options)
+        schedule.report.meta["model_cache"] = "disabled"
+    else:
+        schedule, hit = build_cached(load_inputs, FORMULATIONS[args.formulation], args.data_dir, options)
+        print("Model loaded from cache" if hit else "Model built and cached")
+        schedule.report.meta["model_cache"] = "hit" if hit else "miss"
+    schedule.report.meta["formulation"] = args.formulation
+    if weights:
+        schedule.set_objective(weights)
+    if schedule.domains is not None:
+        print(schedule.domains.describe())
+    print(f"Formulation: {args.formulation}, decision variables: {len(schedule.model.Proto().variables)}")
+
+    if args.warm_start:
+        print(add_schedule_hints(schedule, args.warm_start))
+        solver_config.update(parameters={"repair_hint": True})
+
+    if args.hybrid:
+        status, rows, rounds = solve_hybrid(schedule, solver_config, args.rounds, args.ga_seconds, seed=args.seed)
+        for entry in rounds:
+            print(describe_round(entry))
+        if not rows:
+            print("❌ No feasible solution found.")
+            return status
+        rows = place_rooms(rows, schedule.inputs, solver_config)
+        write_schedule(rows, args.output)
+        print(f"{len(rows)} assignments written to {args.output}")
+        return status
+
+    consumers = ([stream_consumer(args.stream)] if args.stream else []) + ([ProgressPrinter()] if args.progress else [])
+    callback = ScheduleStream(schedule.registry, consumers) if consumers else None
+    rows = None
+    if args.lexicographic:
+        solver, status, stages = solve_lexicographic(schedule, solver_config, args.tiers, weights, callback)
+        for tier, stage_status, value in stages:
+            print(f"  {tier if isinstance(tier, str) else ', '.join(tier)}: {stage_status}"
+                  + ("" if value is None else f", penalty {value}"))
+    elif schedule.rooms is not None:
+        solver, status, rows, unplaced = solve_with_rooms(
+            schedule, lambda: solve(schedule.model, solver_config, callback), solver_config)
+    else:
+        solver, status = solve(schedule.model, solver_config, callback)
+    if reporting:
+        schedule.report.record_solver(solver, status)
+        if args.report:
+            schedule.report.write_json(args.report)
+        if args.report_table:
+            print(schedule.report.table())
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        print("❌ No feasible solution found.")
+        return status
+
+    print("Soft-constraint violations: " + ", ".join(f"{family} {count}" for family, count in
+                                                     penalty_counts(solver, schedule.penalties).items()))
+    if rows is None:
+        rows = place_rooms(schedule.rows(solver), schedule.inputs, solver_config)
+    else:
+        print_rooms(schedule.inputs, unplaced)
+    write_schedule(rows, args.output)
+    print(f"{len(rows)} assignments written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from ortools.sat.python import cp_model
+from solver_config import solve
+
+# Soft constraints are penalty literals grouped by family (schedule.penalties).  The objective
+# minimizes their weighted sum; in lexicographic mode the families are solved tier by tier
+# (hard feasibility first), each tier's optimum is kept as an upper bound and its solution is
+# used as the hint for the next tier.
+DEFAULT_WEIGHTS = {
+    "external": 10,          # students cannot take a required course and its external course
+    "elective_overlap": 3,   # electives a program recommends next to a required course
+    "breaks": 1,             # faculty break preferences
+}
+DEFAULT_TIERS = [["external"], ["elective_overlap"], ["breaks"]]
+
+
+def weighted_penalties(penalties, weights=None, families=None):
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    literals, coefficients = [], []
+    for family, family_literals in penalties.items():
+        if families is not None and family not in families:
+            continue
+        weight = weights.get(family, 1)
+        if weight:
+            literals += family_literals
+            coefficients += [weight] * len(family_literals)
+    return cp_model.LinearExpr.WeightedSum(literals, coefficients)
+
+
+def penalty_counts(solver, penalties):
+    return {family: int(sum(solver.Value(lit) for lit in literals)) for family, literals in penalties.items()}
+
+
+def parse_weights(items):
+    weights = {}
+    for item in items:
+        family, _, value = item.partition("=")
+        weights[family.strip()] = int(value)
+    return weights
+
+
+# "external;elective_overlap,breaks" -> [["external"], ["elective_overlap", "breaks"]]
+def parse_tiers(text):
+    return [[family.strip() for family in tier.split(",") if family.strip()] for tier in text.split(";") if tier.strip()]
+
+
+# Hints every model variable with its value in `solution` (a full CpSolverResponse.solution)
+def hint_solution(model, solution):
+    model.ClearHints()
+    for index, value in enumerate(solution):
+        model.AddHint(model.GetIntVarFromProtoIndex(index), value)
+
+
+def clear_constraint(model, index):
+    # Turns a constraint into an empty one; works for protobuf and pybind CpModelProto
+    ct = model.Proto().constraints[index]
+    if hasattr(ct, "Clear"):
+        ct.Clear()
+    else:
+        ct.copy_from(type(ct)())
+
+
+# Returns (solver, status, stages) where stages lists (tier, status name, tier objective).  The
+# tier bounds only hold for these solves: they are cleared and the weighted objective restored
+# before returning, as the model may be reused (build_cached, IncrementalScheduler).
+def solve_lexicographic(schedule, config=None, tiers=None, weights=None, callback=None):
+    model = schedule.model
+    tiers = tiers or DEFAULT_TIERS
+    stages = []
+    bounds = []
+
+    try:
+        model.ClearObjective()
+        solver, status = solve(model, config)
+        stages.append(("feasibility", solver.StatusName(status), None))
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return solver, status, stages
+
+        for tier in tiers:
+            if not any(schedule.penalties.get(family) for family in tier):
+                continue
+            hint_solution(model, solver.ResponseProto().solution)
+            expr = weighted_penalties(schedule.penalties, weights, tier)
+            model.Minimize(expr)
+            tier_solver, tier_status = solve(model, config, callback)
+            if tier_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                # Out of time without improving on the previous tier's solution: keep that one
+                stages.append((tier, tier_solver.StatusName(tier_status), None))
+                break
+            solver, status = tier_solver, tier_status
+            value = int(round(solver.ObjectiveValue()))
+            stages.append((tier, solver.StatusName(status), value))
+            bounds.append(model.Add(expr <= value).Index())
+        return solver, status, stages
+    finally:
+        for index in bounds:
+            clear_constraint(model, index)
+        model.ClearHints()
+        schedule.set_objective(weights)
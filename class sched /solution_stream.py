@@ -0,0 +1,84 @@
+import os
+import json
+import pandas as pd
+from ortools.sat.python import cp_model
+from final import SCHEDULE_COLUMNS, solution_rows
+
+# Streaming mode: every improving solution found during the search is turned into schedule rows
+# (one vectorized pass over the response's solution vector) and pushed to one or more consumers
+# together with the objective, the current best bound and the solver's wall time.  A consumer is
+# any callable taking the event dict.
+
+
+class ScheduleStream(cp_model.CpSolverSolutionCallback):
+    def __init__(self, registry, consumers=(), min_interval=0.0):
+        super().__init__()
+        self.registry = registry
+        self.consumers = list(consumers)
+        self.min_interval = min_interval  # seconds between pushes; later solutions are skipped until then
+        self.solutions = 0
+        self.last_event = None
+        self._last_push = None
+
+    def on_solution_callback(self):
+        self.solutions += 1
+        now = self.WallTime()  # since this Solve started; a new solve (e.g. a lexicographic tier) starts at 0
+        if self._last_push is not None and 0 <= now - self._last_push < self.min_interval:
+            return
+        self._last_push = now
+        self.last_event = {
+            "solution": self.solutions,
+            "objective": self.ObjectiveValue(),
+            "bound": self.BestObjectiveBound(),
+            "seconds": now,
+            "rows": solution_rows(self.registry, self.Response().solution),
+        }
+        for consumer in self.consumers:
+            consumer(self.last_event)
+
+    # Older OR-Tools versions call the CamelCase name
+    OnSolutionCallback = on_solution_callback
+
+
+# Rewrites the schedule CSV after every improvement; the file is replaced atomically so readers
+# never see a half-written schedule
+class CsvConsumer:
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, event):
+        tmp = self.path + ".tmp"
+        pd.DataFrame(event["rows"], columns=SCHEDULE_COLUMNS).to_csv(tmp, index=False)
+        os.replace(tmp, self.path)
+
+
+# Appends one JSON object per improving solution
+class JsonLinesConsumer:
+    def __init__(self, path, include_rows=True):
+        self.path = path
+        self.include_rows = include_rows
+        open(path, "w").close()
+
+    def __call__(self, event):
+        record = event if self.include_rows else {k: v for k, v in event.items() if k != "rows"}
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+# Hands events to another thread (e.g. the UI) through a queue.Queue
+class QueueConsumer:
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __call__(self, event):
+        self.queue.put(event)
+
+
+class ProgressPrinter:
+    def __call__(self, event):
+        print(f"solution {event['solution']}: objective {event['objective']:g}, bound {event['bound']:g}, "
+              f"{event['seconds']:.2f}s, {len(event['rows'])} assignments")
+
+
+def stream_consumer(path):
+    return JsonLinesConsumer(path) if path.endswith(".jsonl") else CsvConsumer(path)
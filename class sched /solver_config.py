@@ -0,0 +1,115 @@
+import os
+import json
+from ortools.sat.python import cp_model
+
+# Named parameter presets; anything left as None keeps the CP-SAT default
+PRESETS = {
+    "default": {},
+    "quick": {"max_time_in_seconds": 10.0, "presolve_level": 1},
+    "overnight": {"max_time_in_seconds": 8 * 60 * 60.0, "presolve_level": 2, "log_search_progress": True},
+}
+
+
+class SolverConfig:
+    FIELDS = ("num_search_workers", "max_time_in_seconds", "random_seed", "presolve_level", "log_search_progress")
+
+    def __init__(self, num_search_workers=None, max_time_in_seconds=None, random_seed=None,
+                 presolve_level=None, log_search_progress=False, parameters=None):
+        # Production runs use every core unless told otherwise
+        self.num_search_workers = num_search_workers or os.cpu_count() or 1
+        self.max_time_in_seconds = max_time_in_seconds
+        self.random_seed = random_seed
+        self.presolve_level = presolve_level  # 0 = off, 1 = single pass, 2 = full
+        self.log_search_progress = log_search_progress
+        self.parameters = dict(parameters or {})  # raw SatParameters fields
+
+    @classmethod
+    def from_preset(cls, name):
+        if name not in PRESETS:
+            raise KeyError(f"Unknown solver preset: {name} (choose from {', '.join(PRESETS)})")
+        return cls(**PRESETS[name])
+
+    def update(self, **values):
+        for field, value in values.items():
+            if value is None:
+                continue
+            if field == "parameters":
+                self.parameters.update(value)
+            elif field in self.FIELDS:
+                setattr(self, field, value)
+            else:
+                raise KeyError(f"Unknown solver setting: {field}")
+        return self
+
+    def apply(self, solver):
+        params = solver.parameters
+        params.num_workers = int(self.num_search_workers)
+        if self.max_time_in_seconds is not None:
+            params.max_time_in_seconds = float(self.max_time_in_seconds)
+        if self.random_seed is not None:
+            params.random_seed = int(self.random_seed)
+        if self.presolve_level is not None:
+            params.cp_model_presolve = self.presolve_level > 0
+            if self.presolve_level == 1:
+                params.max_presolve_iterations = 1
+        params.log_search_progress = bool(self.log_search_progress)
+        for field, value in self.parameters.items():
+            setattr(params, field, value)
+        return solver
+
+    def to_dict(self):
+        values = {field: getattr(self, field) for field in self.FIELDS}
+        values["parameters"] = dict(self.parameters)
+        return values
+
+
+# Preset first, then the JSON config file, then explicit overrides (e.g. CLI flags)
+def load_solver_config(path=None, preset=None, **overrides):
+    file_values = {}
+    if path:
+        with open(path) as f:
+            file_values = json.load(f)
+    config = SolverConfig.from_preset(preset or file_values.pop("preset", "default"))
+    file_values.pop("preset", None)
+    config.update(**file_values)
+    return config.update(**overrides)
+
+
+def add_solver_arguments(parser):
+    group = parser.add_argument_group("solver")
+    group.add_argument("--solver-config", help="JSON file with solver settings")
+    group.add_argument("--preset", choices=sorted(PRESETS))
+    group.add_argument("--workers", type=int, help="num_search_workers (default: all cores)")
+    group.add_argument("--time-limit", type=float, help="max_time_in_seconds")
+    group.add_argument("--seed", type=int, help="random seed")
+    group.add_argument("--presolve", type=int, choices=[0, 1, 2], help="presolve level")
+    group.add_argument("--log", action="store_true", default=None, help="log solver search progress")
+    group.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                       help="any other SatParameters field, may be repeated")
+    return parser
+
+
+def _parse_value(value):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def config_from_args(args):
+    parameters = {}
+    for item in args.param:
+        name, _, value = item.partition("=")
+        parameters[name.strip()] = _parse_value(value.strip())
+    return load_solver_config(args.solver_config, args.preset, num_search_workers=args.workers,
+                              max_time_in_seconds=args.time_limit, random_seed=args.seed,
+                              presolve_level=args.presolve, log_search_progress=args.log,
+                              parameters=parameters or None)
+
+
+# Single solve entry point used by every scheduling script
+def solve(model, config=None, callback=None):
+    solver = cp_model.CpSolver()
+    (config or SolverConfig()).apply(solver)
+    status = solver.Solve(model, callback)
+    return solver, status
@@ -0,0 +1,22 @@
+import pytest
+from ortools.sat.python import cp_model
+from instance_generator import generate_instance, write_instance
+from data_loader import load_inputs
+from final import BooleanScheduleModel
+from solver_config import SolverConfig, solve
+
+
+# Generated instances are meant for timing the solver, so they have to be feasible
+@pytest.mark.parametrize("scale", [2, 3])
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_instance_is_feasible(tmp_path, scale, seed):
+    write_instance(generate_instance(scale=scale, seed=seed), tmp_path)
+    schedule = BooleanScheduleModel(load_inputs(tmp_path, use_cache=False)).build()
+    _, status = solve(schedule.model, SolverConfig(max_time_in_seconds=60))
+    assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+def test_tas_teach_sections_of_different_courses():
+    intro = generate_instance(scale=3, seed=0)["intro_courses"]
+    courses = intro["course_code"].str.replace(r" section \d+$", "", regex=True)
+    assert (courses.groupby(intro["TA_ID"]).nunique() == intro.groupby("TA_ID").size()).all()
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+# "8:00" / "08:00" -> 480
+def to_minutes(time_str):
+    hours, minutes = str(time_str).strip().split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def minutes_to_str(minutes):
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+class SlotTimes:
+    # timeslot.csv parsed once into integer start/end minutes.
+    # All overlap, window and break-gap checks are lookups into precomputed arrays.
+    def __init__(self, timeslot):
+        self.ids = [str(v) for v in timeslot["TimeSlotID"]]
+        self.index = {slot_id: i for i, slot_id in enumerate(self.ids)}
+        if "start_min" in timeslot.columns:  # already parsed by data_loader
+            self.start = timeslot["start_min"].to_numpy(dtype=np.int32)
+            self.end = timeslot["end_min"].to_numpy(dtype=np.int32)
+        else:
+            self.start = np.array([to_minutes(t) for t in timeslot["start_time"]], dtype=np.int32)
+            self.end = np.array([to_minutes(t) for t in timeslot["end_time"]], dtype=np.int32)
+        self._overlap = {}
+        self._windows = {}
+        self._gap = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    # overlap(buffer)[i, j] is True when slot i and slot j overlap with `buffer` minutes of transition time
+    def overlap(self, buffer=0):
+        matrix = self._overlap.get(buffer)
+        if matrix is None:
+            matrix = ((self.start[:, None] < self.end[None, :] + buffer) &
+                      (self.start[None, :] < self.end[:, None] + buffer))
+            self._overlap[buffer] = matrix
+        return matrix
+
+    # Mask over slots that overlap the fixed window [start, end] (minutes), e.g. an external course
+    def overlaps_window(self, start, end, buffer=0):
+        key = (start, end, buffer)
+        mask = self._windows.get(key)
+        if mask is None:
+            mask = (self.start < end + buffer) & (start < self.end + buffer)
+            self._windows[key] = mask
+        return mask
+
+    # gap()[i, j] = |start of slot j - end of slot i| in minutes
+    def gap(self):
+        if self._gap is None:
+            self._gap = np.abs(self.start[None, :] - self.end[:, None])
+        return self._gap
+
+
+# external.csv parsed once: (course, day) -> (start_minutes, end_minutes)
+def load_external_times(external_courses):
+    external_times = {}
+    parsed = "start_min" in external_courses.columns  # minutes already parsed by data_loader
+    for row in external_courses.itertuples(index=False):
+        days = row.Day
+        if isinstance(days, str):
+            days = [d.strip().capitalize() for d in days.split(",") if d.strip()]
+        if parsed:
+            times = (int(row.start_min), int(row.end_min))
+        else:
+            times = (to_minutes(row.Start_Time), to_minutes(row.End_Time))
+        for day in days:
+            external_times[(row.external_courses, day)] = times
+    return external_times
+
+
+# Faculty time-of-day preference windows in minutes
+TIME_BLOCKS = {
+    "morning": (to_minutes("08:00"), to_minutes("11:59")),
+    "afternoon": (to_minutes("12:00"), to_minutes("15:59")),
+    "evening": (to_minutes("16:00"), to_minutes("19:50")),
+}
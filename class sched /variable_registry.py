@@ -0,0 +1,170 @@
+from array import array
+from collections import defaultdict
+import numpy as np
+
+
+class Interner:
+    # Maps names (course codes, instructors, days, slot ids) to small integer ids
+    def __init__(self, names=()):
+        self._ids = {}
+        self._names = []
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        idx = self._ids.get(name)
+        if idx is None:
+            idx = len(self._names)
+            self._ids[name] = idx
+            self._names.append(name)
+        return idx
+
+    def get(self, name):
+        return self._ids.get(name, -1)
+
+    def name(self, idx):
+        return self._names[idx]
+
+    def names(self):
+        return list(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+
+class VariableRegistry:
+    # Decision variables stored in integer-indexed arrays with precomputed lookups.
+    # Entry i stands for the old schedule_vars key
+    # (course, slot_id, start_time, end_time, day, instructor_or_ta); several entries may share
+    # one literal, e.g. a course's meeting pattern covers the same slot on every meeting day.
+    # Passing slot_ids (e.g. SlotTimes.ids) keeps slot indexes aligned with the time model arrays.
+    def __init__(self, model, slot_ids=()):
+        self.model = model
+        self.courses = Interner()
+        self.slots = Interner(slot_ids)
+        self.days = Interner()
+        self.persons = Interner()
+
+        self._literals = []
+        self._literal_index = {}
+        self._entry_literal = array("i")
+        self._course = array("i")
+        self._slot = array("i")
+        self._day = array("i")
+        self._person = array("i")
+        self._slot_times = {}
+
+        self._by_course = defaultdict(list)
+        self._by_course_day = defaultdict(list)
+        self._by_person_day = defaultdict(list)
+        self._by_slot = defaultdict(list)
+
+    # `var` lets several entries share one literal (e.g. the same slot on every meeting day)
+    def add(self, course, slot_id, start_time, end_time, day, person, name=None, var=None):
+        c = self.courses.intern(course)
+        s = self.slots.intern(slot_id)
+        d = self.days.intern(day)
+        p = self.persons.intern(person)
+        self._slot_times.setdefault(s, (start_time, end_time))
+
+        idx = len(self._entry_literal)
+        if var is None:
+            if name is None:
+                name = f"{(course, slot_id, start_time, end_time, day, person)}"
+            var = self.model.NewBoolVar(name)
+        lit = self._literal_index.get(var.Index())
+        if lit is None:
+            lit = len(self._literals)
+            self._literal_index[var.Index()] = lit
+            self._literals.append(var)
+        self._entry_literal.append(lit)
+        self._course.append(c)
+        self._slot.append(s)
+        self._day.append(d)
+        self._person.append(p)
+
+        self._by_course[c].append(idx)
+        self._by_course_day[(c, d)].append(idx)
+        self._by_person_day[(p, d)].append(idx)
+        self._by_slot[s].append(idx)
+        return idx
+
+    def __len__(self):
+        return len(self._entry_literal)
+
+    def var(self, idx):
+        return self._literals[self._entry_literal[idx]]
+
+    def vars(self, indices):
+        return [self._literals[self._entry_literal[i]] for i in indices]
+
+    def literal_of(self, idx):
+        return self._entry_literal[idx]
+
+    def literals(self):
+        return list(self._literals)
+
+    def num_literals(self):
+        return len(self._literals)
+
+    def key(self, idx):
+        s = self._slot[idx]
+        start_time, end_time = self._slot_times[s]
+        return (self.courses.name(self._course[idx]), self.slots.name(s), start_time, end_time,
+                self.days.name(self._day[idx]), self.persons.name(self._person[idx]))
+
+    def items(self):
+        for idx in range(len(self._entry_literal)):
+            yield self.key(idx), self.var(idx)
+
+    # Entries whose literal is true in a full solution vector (CpSolverResponse.solution, indexed
+    # by proto variable index), found in one vectorized pass
+    def chosen(self, solution):
+        literal_index = np.fromiter((var.Index() for var in self._literals), dtype=np.int64, count=len(self._literals))
+        values = np.asarray(solution, dtype=np.int64)[literal_index]
+        return np.flatnonzero(values[np.frombuffer(self._entry_literal, dtype=np.int32)])
+
+    def course_of(self, idx):
+        return self.courses.name(self._course[idx])
+
+    def slot_of(self, idx):
+        return self.slots.name(self._slot[idx])
+
+    def slot_index(self, idx):
+        return self._slot[idx]
+
+    def day_of(self, idx):
+        return self.days.name(self._day[idx])
+
+    def person_of(self, idx):
+        return self.persons.name(self._person[idx])
+
+    def times_of(self, idx):
+        return self._slot_times[self._slot[idx]]
+
+    # Secondary indexes, all O(1); unknown names give an empty list
+    def by_course(self, course):
+        return self._by_course.get(self.courses.get(course), [])
+
+    def by_course_day(self, course, day):
+        return self._by_course_day.get((self.courses.get(course), self.days.get(day)), [])
+
+    def by_person_day(self, person, day):
+        return self._by_person_day.get((self.persons.get(person), self.days.get(day)), [])
+
+    def by_slot(self, slot_id):
+        return self._by_slot.get(self.slots.get(slot_id), [])
+
+    # Distinct literals of a course, one per candidate slot when entries share meeting patterns
+    def course_literals(self, course):
+        seen = {}
+        for idx in self.by_course(course):
+            seen.setdefault(self._entry_literal[idx], None)
+        return [self._literals[lit] for lit in seen]
+
+    def by_person(self, person):
+        p = self.persons.get(person)
+        return [i for d in range(len(self.days)) for i in self._by_person_day.get((p, d), [])]
@@ -0,0 +1,76 @@
+from collections import Counter, defaultdict
+import pandas as pd
+from time_model import to_minutes
+
+
+class HintReport:
+    def __init__(self):
+        self.matched = []      # courses whose previous slot is still a candidate
+        self.repaired = []     # courses moved to the nearest still-available slot
+        self.defaulted = []    # courses missing from the previous schedule
+        self.dropped = []      # rows for courses that are no longer in the model
+
+    def __str__(self):
+        return (f"hints: {len(self.matched)} matched, {len(self.repaired)} repaired, "
+                f"{len(self.defaulted)} new courses, {len(self.dropped)} stale courses dropped")
+
+
+def _candidate_slots(registry, course):
+    # slot index -> literal index for every candidate slot of a course
+    candidates = {}
+    for idx in registry.by_course(course):
+        candidates.setdefault(registry.slot_index(idx), registry.literal_of(idx))
+    return candidates
+
+
+# Map a previous final_schedule.csv onto the model's decision literals.
+# Returns {literal index: 0/1} covering every decision literal, plus a HintReport.
+def schedule_hints(registry, slot_times, previous):
+    if isinstance(previous, str):
+        previous = pd.read_csv(previous)
+    report = HintReport()
+
+    previous_slots = defaultdict(Counter)
+    previous_starts = {}
+    for row in previous.to_dict("records"):
+        course = row["Course"]
+        if course not in registry.courses:
+            report.dropped.append(course)
+            continue
+        previous_slots[course][str(row["Slot"])] += 1
+        previous_starts.setdefault(course, to_minutes(row["Start Time"]))
+
+    hints = {lit: 0 for lit in range(registry.num_literals())}
+    for course in registry.courses.names():
+        candidates = _candidate_slots(registry, course)
+        if not candidates:
+            continue
+        slot_id = previous_slots[course].most_common(1)[0][0] if previous_slots[course] else None
+        slot = slot_times.index.get(slot_id, -1)
+        if slot in candidates:
+            report.matched.append(course)
+        elif course in previous_starts:
+            # Stale hint: the slot template changed or is no longer allowed, take the closest start
+            slot = min(candidates, key=lambda s: abs(int(slot_times.start[s]) - previous_starts[course]))
+            report.repaired.append(course)
+        else:
+            slot = min(candidates)
+            report.defaulted.append(course)
+        hints[candidates[slot]] = 1
+    report.dropped = sorted(set(report.dropped))
+    return hints, report
+
+
+def add_schedule_hints(schedule, previous):
+    model, registry = schedule.model, schedule.registry
+    hints, report = schedule_hints(registry, schedule.slot_times, previous)
+    literals = registry.literals()
+    model.ClearHints()
+    for lit, value in hints.items():
+        model.AddHint(literals[lit], value)
+
+    # Complete the hint with the formulation's auxiliary variables
+    values = {literals[lit].Index(): value for lit, value in hints.items()}
+    for var, value in schedule.auxiliary_hints(lambda lit: values[lit.Index()]):
+        model.AddHint(var, value)
+    return report